@@ -11,36 +11,363 @@ import uuid
 import asyncio # For running async client code
 import logging
 import os
+import time
+from typing import AsyncIterator, Optional
 
 import httpx
 # A2A SDK imports
 from a2a.client import A2ACardResolver, A2AClient
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
+from a2a.types import (
+    AgentCard,
+    CancelTaskRequest,
+    JSONRPCErrorResponse,
+    Message,
+    MessageSendParams,
+    SendMessageRequest,
+    SendStreamingMessageRequest,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskState,
+    TaskStatusUpdateEvent,
+)
+
 
 
+from a2a.utils import get_message_text, get_text_parts, new_agent_text_message # For agent executor's response
 
-from a2a.utils import new_agent_text_message # For agent executor's response
+from card_registry import AgentCardRegistry
+from instrumentation import configure_async_logging
+from resilience import AgentCallPolicy, CircuitOpenError, retrieve_exception
+from transport import InProcessA2AClient, get_local_handler
+from utils import get_config
 
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
+configure_async_logging() # Log records are written by a background thread, not the event loop
 logger = logging.getLogger("A2A_Tutorial_Notebook") # Create a logger specific to this tutorial
 logger.info("A2A SDK and libraries imported. Logging configured.")
 
 # Define base URLs for our agents (these will be separate server processes)
-NEWS_AGENT_BASE_URL = "http://localhost:9001"
-EVENTS_AGENT_BASE_URL = "http://localhost:9002"
+config = get_config()
+NEWS_AGENT_BASE_URL = config['NEWS_AGENT_BASE_URL']
+EVENTS_AGENT_BASE_URL = config['EVENTS_AGENT_BASE_URL']
+AGENT_CALL_TIMEOUT_SECONDS = float(config.get('AGENT_CALL_TIMEOUT_SECONDS', 10))
+AGENT_CARD_TTL_SECONDS = float(config.get('AGENT_CARD_TTL_SECONDS', 300))
+AGENT_CARD_CACHE_PATH = config.get('AGENT_CARD_CACHE_PATH') # Optional on-disk card cache
+# Tail-latency protection (see resilience.py)
+AGENT_CALL_MIN_TIMEOUT_SECONDS = float(config.get('AGENT_CALL_MIN_TIMEOUT_SECONDS', 0.5))
+AGENT_CALL_TIMEOUT_MULTIPLIER = float(config.get('AGENT_CALL_TIMEOUT_MULTIPLIER', 3))
+HEDGE_PERCENTILE = config.get('HEDGE_PERCENTILE', 0.95) # null disables hedging
+CIRCUIT_FAILURE_THRESHOLD = int(config.get('CIRCUIT_FAILURE_THRESHOLD', 5))
+CIRCUIT_RESET_SECONDS = float(config.get('CIRCUIT_RESET_SECONDS', 30))
+TLDR_BUDGET_SECONDS = float(config.get('TLDR_BUDGET_SECONDS', 3)) # Whole TLDR, however many agents are slow
 
 # Standard paths for agent cards (as per A2A specification)
 PUBLIC_AGENT_CARD_PATH = "/.well-known/agent.json"
 EXTENDED_AGENT_CARD_PATH = "/agent/authenticatedExtendedCard" # If we use extended cards
 
+# Request (MessageSendParams) metadata key holding the absolute (epoch seconds) deadline of a request
+DEADLINE_METADATA_KEY = "deadline"
+
 logger.info(f"News Agent will be expected at: {NEWS_AGENT_BASE_URL}")
 logger.info(f"Events Agent will be expected at: {EVENTS_AGENT_BASE_URL}")
 
 
+def get_response_text(result) -> str:
+    """Pull the text out of a Message or Task returned by a downstream agent."""
+    if isinstance(result, Message):
+        return get_message_text(result)
+    if isinstance(result, Task):
+        texts = []
+        for artifact in result.artifacts or []:
+            texts.extend(get_text_parts(artifact.parts))
+        if not texts and result.status.message:
+            texts.append(get_message_text(result.status.message))
+        return "\n".join(texts)
+    return str(result)
+
+
+# UserFacingAgent: Orchestrates the TLDR by asking the other agents concurrently
+class UserFacingAgent:
+    """Builds the TLDR by fanning out to NewsInfoAgent and EventsInfoAgent.
+
+    All downstream calls share one pooled httpx.AsyncClient (keep-alive), run
+    concurrently and are bounded by a per-call timeout, so the TLDR takes as
+    long as the slowest agent rather than the sum of all of them.
+
+    With `resilient` on, each agent also gets an AgentCallPolicy (adaptive
+    timeout, hedged requests, circuit breaker), so one slow or failing agent
+    only costs its own section of the TLDR, which is marked unavailable.
+    `get_tldr` never takes longer than `budget` seconds overall.
+    """
+
+    def __init__(
+        self,
+        agent_urls: dict[str, str] | None = None,
+        timeout: float = AGENT_CALL_TIMEOUT_SECONDS,
+        resilient: bool = True,
+        budget: float = TLDR_BUDGET_SECONDS,
+    ):
+        # Section title -> agent base URL
+        self.agent_urls = agent_urls or {
+            "News": NEWS_AGENT_BASE_URL,
+            "Events": EVENTS_AGENT_BASE_URL,
+        }
+        self.timeout = timeout
+        self.budget = budget
+        self.httpx_client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30),
+        )
+        self.card_registry = AgentCardRegistry(
+            httpx_client=self.httpx_client,
+            # Co-hosted agents are called in-process and need no card
+            base_urls=[url for url in self.agent_urls.values() if not get_local_handler(url)],
+            card_path=PUBLIC_AGENT_CARD_PATH,
+            ttl_seconds=AGENT_CARD_TTL_SECONDS,
+            cache_path=AGENT_CARD_CACHE_PATH,
+        )
+        # base URL -> (card the client was built from, client)
+        self._clients: dict[str, tuple[AgentCard, A2AClient]] = {}
+        # Fire-and-forget tasks/cancel calls for abandoned streams
+        self._cancellations: set[asyncio.Task] = set()
+        # Agent calls that missed the TLDR budget, left to finish on their own
+        self._late_calls: set[asyncio.Future] = set()
+        # base URL -> call policy; empty when resilience is off
+        self.policies: dict[str, AgentCallPolicy] = {}
+        if resilient:
+            self.policies = {
+                url: AgentCallPolicy(
+                    max_timeout=timeout,
+                    min_timeout=min(AGENT_CALL_MIN_TIMEOUT_SECONDS, timeout),
+                    timeout_multiplier=AGENT_CALL_TIMEOUT_MULTIPLIER,
+                    hedge_percentile=HEDGE_PERCENTILE,
+                    failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                    reset_seconds=CIRCUIT_RESET_SECONDS,
+                )
+                for url in self.agent_urls.values()
+            }
+
+    async def __aenter__(self) -> "UserFacingAgent":
+        await self.card_registry.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        for call in self._late_calls:
+            call.cancel()
+        if self._late_calls:
+            await asyncio.gather(*self._late_calls, return_exceptions=True)
+        if self._cancellations:
+            await asyncio.gather(*self._cancellations, return_exceptions=True)
+        await self.card_registry.close()
+        await self.httpx_client.aclose()
+
+    async def get_client(self, base_url: str) -> A2AClient | InProcessA2AClient:
+        """Get an A2AClient built from the registry's current card for `base_url`.
+
+        Agents hosted in this process get an InProcessA2AClient instead, which
+        skips HTTP and JSON-RPC serialization entirely.
+        """
+        local_handler = get_local_handler(base_url)
+        if local_handler is not None:
+            return InProcessA2AClient(local_handler)
+
+        agent_card = await self.card_registry.get(base_url)
+        cached = self._clients.get(base_url)
+        if cached is None or cached[0] is not agent_card:
+            # First use, or the registry picked up a changed card
+            cached = (agent_card, A2AClient(httpx_client=self.httpx_client, agent_card=agent_card))
+            self._clients[base_url] = cached
+        return cached[1]
+
+    def message_params(self, query: str, deadline: Optional[float] = None) -> MessageSendParams:
+        send_message_payload = {
+            'message': {
+                'role': 'user',
+                'parts': [{'kind': 'text', 'text': query}],
+                'messageId': uuid.uuid4().hex,
+            },
+        }
+        if deadline is not None:
+            # Downstream executors stop working on the request once it passes
+            send_message_payload['metadata'] = {DEADLINE_METADATA_KEY: deadline}
+        return MessageSendParams(**send_message_payload)
+
+    async def ask(self, base_url: str, query: str, timeout: Optional[float] = None) -> str:
+        """Send one message to a downstream agent and return its text reply."""
+        timeout = timeout or self.timeout
+        client = await self.get_client(base_url)
+        request = SendMessageRequest(
+            id=str(uuid.uuid4()), params=self.message_params(query, deadline=time.time() + timeout)
+        )
+        response = await client.send_message(request, http_kwargs={'timeout': timeout})
+
+        if isinstance(response.root, JSONRPCErrorResponse):
+            raise RuntimeError(response.root.error.message)
+        result = response.root.result
+        if isinstance(result, Task) and result.status.state == TaskState.failed:
+            raise RuntimeError(get_response_text(result))
+        return get_response_text(result)
+
+    async def ask_streaming(self, base_url: str, query: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Send one streaming message and yield each text chunk as it arrives.
+
+        If the caller stops consuming before the task finishes (timeout,
+        disconnect), the downstream task is cancelled so it stops using
+        capacity.
+        """
+        timeout = timeout or self.timeout
+        client = await self.get_client(base_url)
+        request = SendStreamingMessageRequest(
+            id=str(uuid.uuid4()), params=self.message_params(query, deadline=time.time() + timeout)
+        )
+        task_id = None
+        finished = False
+        try:
+            async for response in client.send_message_streaming(request, http_kwargs={'timeout': timeout}):
+                if isinstance(response.root, JSONRPCErrorResponse):
+                    raise RuntimeError(response.root.error.message)
+                event = response.root.result
+                if isinstance(event, Task):
+                    task_id = event.id
+                elif isinstance(event, (TaskArtifactUpdateEvent, TaskStatusUpdateEvent)):
+                    task_id = event.task_id
+
+                if isinstance(event, TaskArtifactUpdateEvent):
+                    for text in get_text_parts(event.artifact.parts):
+                        yield text
+                elif isinstance(event, Message):
+                    yield get_message_text(event)
+                elif isinstance(event, TaskStatusUpdateEvent) and event.status.state == TaskState.failed:
+                    finished = True
+                    raise RuntimeError(get_message_text(event.status.message) if event.status.message else "Task failed")
+            finished = True
+        finally:
+            if task_id and not finished:
+                cancellation = asyncio.ensure_future(self.cancel_task(base_url, task_id))
+                self._cancellations.add(cancellation)
+                cancellation.add_done_callback(self._cancellations.discard)
+
+    async def cancel_task(self, base_url: str, task_id: str) -> None:
+        """Best-effort tasks/cancel for a downstream task we no longer need."""
+        try:
+            client = await self.get_client(base_url)
+            request = CancelTaskRequest(id=str(uuid.uuid4()), params=TaskIdParams(id=task_id))
+            response = await client.cancel_task(request, http_kwargs={'timeout': self.timeout})
+            if isinstance(response.root, JSONRPCErrorResponse):
+                # Usually the task already finished on its own
+                logger.info(f"Cancel of task {task_id} at {base_url} not applied: {response.root.error.message}")
+        except Exception as e:
+            logger.warning(f"Could not cancel task {task_id} at {base_url}: {e!r}")
+
+    async def call_agent(self, base_url: str, query: str) -> str:
+        """Ask one agent, under its call policy when resilience is on."""
+        policy = self.policies.get(base_url)
+        if policy is None:
+            return await asyncio.wait_for(self.ask(base_url, query), self.timeout)
+        return await policy.call(lambda timeout: self.ask(base_url, query, timeout))
+
+    async def get_tldr(self, query: str = "What should I know today?", budget: Optional[float] = None) -> str:
+        """Ask every agent at once and merge their answers into one TLDR.
+
+        Agents that fail, time out or have an open circuit are listed as
+        unavailable; the other sections are returned as usual. Sections still
+        missing after `budget` seconds (default: `self.budget`) are listed as
+        unavailable too, without waiting for them. Their calls finish in the
+        background (each is bounded by its own timeout), so the call policies
+        still see how slow the agent was and can open its circuit.
+        """
+        calls = {
+            name: asyncio.ensure_future(self.call_agent(url, query))
+            for name, url in self.agent_urls.items()
+        }
+        try:
+            await asyncio.wait(calls.values(), timeout=budget or self.budget)
+        except asyncio.CancelledError:
+            for call in calls.values():
+                call.cancel()
+            raise
+
+        lines = ["TLDR of the day:"]
+        for name, call in calls.items():
+            if not call.done():
+                self._leave_running(call)
+                lines.append(f"- {name}: unavailable (over budget)")
+            elif call.exception() is not None:
+                error = call.exception()
+                if not isinstance(error, CircuitOpenError):
+                    logger.warning(f"{name} agent failed: {error!r}")
+                lines.append(f"- {name}: unavailable ({type(error).__name__})")
+            else:
+                lines.append(f"- {name}: {call.result()}")
+        return "\n".join(lines)
+
+    def _leave_running(self, call: asyncio.Future) -> None:
+        self._late_calls.add(call)
+        call.add_done_callback(self._late_calls.discard)
+        call.add_done_callback(retrieve_exception)
+
+    async def stream_tldr(self, query: str = "What should I know today?") -> AsyncIterator[str]:
+        """Yield TLDR lines as soon as any agent streams an item.
+
+        Time to first line is that of the fastest agent's first item; the
+        stream ends when every agent has finished or hit its timeout. Streams
+        are not hedged, but the circuit breaker and adaptive timeout apply.
+        """
+        yield "TLDR of the day:"
+        lines: asyncio.Queue = asyncio.Queue()
+
+        async def stream_agent(name: str, base_url: str, timeout: float) -> None:
+            async for text in self.ask_streaming(base_url, query, timeout):
+                await lines.put(f"- {name}: {text}")
+
+        async def pump(name: str, base_url: str) -> None:
+            try:
+                policy = self.policies.get(base_url)
+                if policy is None:
+                    async with asyncio.timeout(self.timeout):
+                        await stream_agent(name, base_url, self.timeout)
+                else:
+                    async with policy.guard() as timeout:
+                        await stream_agent(name, base_url, timeout)
+            except Exception as e:
+                if not isinstance(e, CircuitOpenError):
+                    logger.warning(f"{name} agent failed: {e!r}")
+                await lines.put(f"- {name}: unavailable ({type(e).__name__})")
+            finally:
+                await lines.put(None)  # This agent is done
+
+        pumps = [asyncio.create_task(pump(name, url)) for name, url in self.agent_urls.items()]
+        try:
+            remaining = len(pumps)
+            while remaining:
+                line = await lines.get()
+                if line is None:
+                    remaining -= 1
+                else:
+                    yield line
+        finally:
+            for task in pumps:
+                task.cancel()
+
 
+async def main() -> None:
+    async with UserFacingAgent() as user_facing_agent:
+        async for line in user_facing_agent.stream_tldr():
+            print(line, flush=True)
+        logger.info(f"Agent card registry: {user_facing_agent.card_registry.metrics()}")
+        for name, url in user_facing_agent.agent_urls.items():
+            if url in user_facing_agent.policies:
+                logger.info(f"{name} call policy: {user_facing_agent.policies[url].metrics()}")
 
 
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,198 @@
+"""Throughput and latency benchmark for the A2A servers and the TLDR fan-out.
+
+Serves the co-hosted app (launcher.build_app) either in-process, through
+httpx.ASGITransport with the orchestrator using the in-process transport, or
+under uvicorn on a local port with every hop over HTTP. It then drives one or
+more workloads at a fixed concurrency:
+
+    news-send / events-send       SendMessageRequest to one agent
+    news-stream / events-stream   SendStreamingMessageRequest to one agent
+    tldr / tldr-stream            the orchestrator endpoints (fan-out to both agents)
+
+For each workload it reports RPS, latency percentiles (plus time to first
+chunk for streaming workloads), CPU time per request and RSS growth. Client
+and server share the process, so CPU and memory cover both sides. Results are
+appended to a JSONL file so runs can be compared over time.
+
+Usage:
+    python benchmark_a2a.py --server uvicorn --requests 2000 --concurrency 32
+    python benchmark_a2a.py --workloads news-send tldr --bust-cache
+"""
+import argparse
+import asyncio
+import json
+import platform
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+from a2a.client import A2AClient
+from a2a.types import JSONRPCErrorResponse, MessageSendParams, SendMessageRequest, SendStreamingMessageRequest
+
+from benchmark_task_store import current_rss_mb
+from benchmark_transport import serve_in_background
+from launcher import build_app
+
+WORKLOADS = ["news-send", "news-stream", "events-send", "events-stream", "tldr", "tldr-stream"]
+DEFAULT_QUERY = "What should I know today?"
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def message_params(query: str) -> MessageSendParams:
+    return MessageSendParams(**{
+        'message': {
+            'role': 'user',
+            'parts': [{'kind': 'text', 'text': query}],
+            'messageId': uuid.uuid4().hex,
+        },
+    })
+
+
+def make_call(workload: str, client: httpx.AsyncClient, base_url: str):
+    """Return `call(query, on_first_chunk)` performing one request of `workload`."""
+    target, _, kind = workload.partition("-")
+
+    if target == "tldr":
+        path = "/tldr/stream" if kind == "stream" else "/tldr"
+
+        async def call_tldr(query: str, on_first_chunk) -> None:
+            async with client.stream("GET", f"{base_url}{path}", params={"q": query}) as response:
+                response.raise_for_status()
+                async for _chunk in response.aiter_text():
+                    on_first_chunk()
+        return call_tldr
+
+    a2a_client = A2AClient(httpx_client=client, url=f"{base_url}/{target}/")
+
+    if kind == "stream":
+        async def call_stream(query: str, on_first_chunk) -> None:
+            request = SendStreamingMessageRequest(id=str(uuid.uuid4()), params=message_params(query))
+            async for response in a2a_client.send_message_streaming(request):
+                if isinstance(response.root, JSONRPCErrorResponse):
+                    raise RuntimeError(response.root.error.message)
+                on_first_chunk()
+        return call_stream
+
+    async def call_send(query: str, on_first_chunk) -> None:
+        request = SendMessageRequest(id=str(uuid.uuid4()), params=message_params(query))
+        response = await a2a_client.send_message(request)
+        if isinstance(response.root, JSONRPCErrorResponse):
+            raise RuntimeError(response.root.error.message)
+        on_first_chunk()
+    return call_send
+
+
+async def run_workload(call, requests: int, concurrency: int, bust_cache: bool) -> dict:
+    latencies = []
+    first_chunk = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        query = f"{DEFAULT_QUERY} #{i}" if bust_cache else DEFAULT_QUERY
+        async with semaphore:
+            start = time.perf_counter()
+            first = []
+
+            def on_first_chunk():
+                if not first:
+                    first.append(time.perf_counter() - start)
+            try:
+                await call(query, on_first_chunk)
+            except Exception:
+                errors += 1
+                return
+            latencies.append((time.perf_counter() - start) * 1000)
+            if first:
+                first_chunk.append(first[0] * 1000)
+
+    await call(DEFAULT_QUERY, lambda: None)  # warm up connections, cards and caches
+    rss_start = current_rss_mb()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    rss_end = current_rss_mb()
+
+    latencies.sort()
+    first_chunk.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.50),
+        "p90_ms": percentile(latencies, 0.90),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+        "first_chunk_p50_ms": percentile(first_chunk, 0.50),
+        "first_chunk_p99_ms": percentile(first_chunk, 0.99),
+        "cpu_ms_per_request": cpu * 1000 / requests,
+        "rss_end_mb": round(rss_end, 1),
+        "rss_growth_kb_per_request": (rss_end - rss_start) * 1024 / requests,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="A2A throughput and latency benchmark")
+    parser.add_argument("--server", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=WORKLOADS)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--bust-cache", action="store_true", help="Use a distinct query per request so agent caches miss")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--output", default="a2a_benchmark.jsonl")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency)
+    if args.server == "uvicorn":
+        base_url = f"http://127.0.0.1:{args.port}"
+        server = serve_in_background(args.port)
+        client = httpx.AsyncClient(limits=limits, timeout=30)
+    else:
+        base_url = "http://benchmark"
+        app = build_app(base_url=base_url, in_process=True)
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), timeout=30)
+
+    results = {}
+    try:
+        for workload in args.workloads:
+            results[workload] = await run_workload(
+                make_call(workload, client, base_url), args.requests, args.concurrency, args.bust_cache
+            )
+            r = results[workload]
+            print(
+                f"{workload}: {r['requests_per_second']:.0f} req/s, p50 {r['p50_ms']:.2f} ms, "
+                f"p99 {r['p99_ms']:.2f} ms, first chunk p50 {r['first_chunk_p50_ms']:.2f} ms, "
+                f"{r['cpu_ms_per_request']:.2f} ms CPU/req, {r['errors']} errors"
+            )
+    finally:
+        await client.aclose()
+        if args.server == "uvicorn":
+            server.should_exit = True
+        else:
+            await lifespan.__aexit__(None, None, None)
+
+    with open(args.output, "a") as f:
+        f.write(json.dumps({
+            "run_at": datetime.now().isoformat(),
+            "server": args.server,
+            "bust_cache": args.bust_cache,
+            "python": platform.python_version(),
+            "results": results,
+        }) + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""Soak benchmark for the A2A task stores.
+
+Pushes a long stream of task save/get cycles (the same pattern the request
+handler produces) through InMemoryTaskStore and SQLiteTaskStore, sampling RSS
+as it goes. The in-memory store grows with every task; the SQLite store should
+stay flat once its hot set is full.
+
+Usage:
+    python benchmark_task_store.py --requests 1000000 --output task_store_benchmark.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import Task, TaskState, TaskStatus
+from a2a.utils import new_agent_text_message
+
+from task_store import SQLiteTaskStore
+
+
+def current_rss_mb() -> float:
+    """Current resident set size (Linux), falling back to the peak elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_task(i: int) -> Task:
+    context_id = str(uuid.uuid4())
+    task_id = str(uuid.uuid4())
+    return Task(
+        id=task_id,
+        context_id=context_id,
+        status=TaskStatus(
+            state=TaskState.completed,
+            message=new_agent_text_message(f"Breaking News #{i}: AI discovers a new way to make coffee!", context_id, task_id),
+        ),
+    )
+
+
+async def soak(store, requests: int, samples: int) -> dict:
+    sample_every = max(1, requests // samples)
+    rss = []
+    start = time.perf_counter()
+    for i in range(requests):
+        task = make_task(i)
+        await store.save(task)  # submitted
+        await store.save(task)  # completed
+        await store.get(task.id)
+        if i % sample_every == 0:
+            rss.append(round(current_rss_mb(), 1))
+    elapsed = time.perf_counter() - start
+    rss.append(round(current_rss_mb(), 1))
+    return {
+        "requests": requests,
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed,
+        "rss_start_mb": rss[0],
+        "rss_end_mb": rss[-1],
+        "rss_growth_mb": rss[-1] - rss[0],
+        "rss_samples_mb": rss,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Soak benchmark for A2A task stores")
+    parser.add_argument("--requests", type=int, default=1_000_000)
+    parser.add_argument("--samples", type=int, default=20, help="RSS samples per run")
+    parser.add_argument("--stores", nargs="+", default=["sqlite", "memory"], choices=["sqlite", "memory"])
+    parser.add_argument("--max-hot-tasks", type=int, default=1000)
+    parser.add_argument("--output", default="task_store_benchmark.jsonl")
+    args = parser.parse_args()
+
+    results = {}
+    # Run the bounded store first so the in-memory store's growth does not
+    # inflate its baseline.
+    for name in args.stores:
+        if name == "sqlite":
+            with tempfile.TemporaryDirectory() as tmp:
+                store = SQLiteTaskStore(os.path.join(tmp, "soak_tasks.db"), max_hot_tasks=args.max_hot_tasks)
+                results[name] = await soak(store, args.requests, args.samples)
+                await store.close()
+        else:
+            results[name] = await soak(InMemoryTaskStore(), args.requests, args.samples)
+        print(
+            f"{name}: {results[name]['requests_per_second']:.0f} req/s, "
+            f"RSS {results[name]['rss_start_mb']} -> {results[name]['rss_end_mb']} MB"
+        )
+
+    with open(args.output, "a") as f:
+        f.write(json.dumps({"run_at": datetime.now().isoformat(), "results": results}) + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Compare TLDR throughput over HTTP versus the in-process transport.
+
+Serves the co-hosted app (launcher.build_app) with uvicorn on a local port and
+drives UserFacingAgent.get_tldr with a fixed concurrency, first against the
+HTTP endpoints and then through InProcessA2AClient.
+
+Usage:
+    python benchmark_transport.py --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime
+
+import uvicorn
+
+from agent import UserFacingAgent
+from launcher import COHOSTED_AGENTS, build_app
+from transport import register_local_agent
+
+
+async def drive(agent_urls: dict[str, str], requests: int, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with UserFacingAgent(agent_urls=agent_urls) as user_facing_agent:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                await user_facing_agent.get_tldr()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        await user_facing_agent.get_tldr()  # warm up connections / cards
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "requests_per_second": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def serve_in_background(port: int) -> uvicorn.Server:
+    app = build_app(base_url=f"http://127.0.0.1:{port}", in_process=False)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP vs in-process A2A transport benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--output", default="transport_benchmark.jsonl")
+    args = parser.parse_args()
+
+    server = serve_in_background(args.port)
+    http_urls = {
+        section: f"http://127.0.0.1:{args.port}/{path}/"
+        for path, (section, *_rest) in COHOSTED_AGENTS.items()
+    }
+    local_urls = {}
+    for path, (section, _card, request_handler) in COHOSTED_AGENTS.items():
+        local_urls[section] = f"local://{path}"
+        register_local_agent(local_urls[section], request_handler)
+
+    results = {
+        "http": await drive(http_urls, args.requests, args.concurrency),
+        "in_process": await drive(local_urls, args.requests, args.concurrency),
+    }
+    server.should_exit = True
+
+    for mode, result in results.items():
+        print(f"{mode}: {result['requests_per_second']:.0f} TLDR/s, p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms")
+    with open(args.output, "a") as f:
+        f.write(json.dumps({"run_at": datetime.now().isoformat(), "results": results}) + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+from a2a.types import AgentCard
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CardEntry:
+    """A cached agent card plus what is needed to revalidate it."""
+    card: AgentCard
+    etag: Optional[str]
+    fetched_at: float  # wall clock, so entries loaded from disk age correctly
+    fetch_seconds: float = 0.0  # what resolving this card over HTTP last cost
+
+
+class AgentCardRegistry:
+    """Resolves agent cards once and serves them from memory.
+
+    Cards are fetched when the registry starts (or read from the optional disk
+    cache), then served with a dict lookup. A background task revalidates
+    entries older than `ttl_seconds` with If-None-Match, so callers never wait
+    on the well-known card endpoint once the registry is warm.
+    """
+
+    def __init__(
+        self,
+        httpx_client: httpx.AsyncClient,
+        base_urls: list[str],
+        card_path: str,
+        ttl_seconds: float = 300,
+        cache_path: Optional[str] = None,
+    ):
+        self.httpx_client = httpx_client
+        self.base_urls = [url.rstrip('/') for url in base_urls]
+        self.card_path = '/' + card_path.lstrip('/')
+        self.ttl_seconds = ttl_seconds
+        self.cache_path = cache_path
+        self._entries: dict[str, CardEntry] = {}
+        self._revalidate_task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+        self.latency_saved_seconds = 0.0
+
+    async def start(self) -> None:
+        """Warm the registry and start background revalidation."""
+        self._load_disk_cache()
+        missing = [url for url in self.base_urls if url not in self._entries]
+        results = await asyncio.gather(*(self._fetch(url) for url in missing), return_exceptions=True)
+        for url, result in zip(missing, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Could not resolve agent card for {url}: {result!r}")
+        self._save_disk_cache()
+
+        if self._revalidate_task is None:
+            self._revalidate_task = asyncio.create_task(self._revalidate_loop())
+
+    async def close(self) -> None:
+        if self._revalidate_task:
+            self._revalidate_task.cancel()
+            try:
+                await self._revalidate_task
+            except asyncio.CancelledError:
+                pass
+            self._revalidate_task = None
+        self._save_disk_cache()
+
+    async def get(self, base_url: str) -> AgentCard:
+        """Return the card for `base_url`, fetching it only on a cold miss."""
+        entry = self._entries.get(base_url.rstrip('/'))
+        if entry is not None:
+            self.hits += 1
+            self.latency_saved_seconds += entry.fetch_seconds
+            return entry.card
+
+        self.misses += 1
+        entry = await self._fetch(base_url.rstrip('/'))
+        self._save_disk_cache()
+        return entry.card
+
+    async def revalidate(self, base_url: str) -> None:
+        """Conditionally re-fetch one card; a 304 only refreshes its age."""
+        entry = self._entries.get(base_url)
+        self.revalidations += 1
+        await self._fetch(base_url, etag=entry.etag if entry else None)
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "cards": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "revalidations": self.revalidations,
+            "not_modified": self.not_modified,
+            # Every hit is a card fetch the caller did not have to wait for
+            "latency_saved_ms": self.latency_saved_seconds * 1000,
+        }
+
+    async def _fetch(self, base_url: str, etag: Optional[str] = None) -> CardEntry:
+        headers = {"If-None-Match": etag} if etag else {}
+        start = time.perf_counter()
+        response = await self.httpx_client.get(f"{base_url}{self.card_path}", headers=headers)
+        fetch_seconds = time.perf_counter() - start
+
+        if response.status_code == 304 and base_url in self._entries:
+            self.not_modified += 1
+            entry = self._entries[base_url]
+            entry.fetched_at = time.time()
+            entry.fetch_seconds = fetch_seconds
+            return entry
+
+        response.raise_for_status()
+        # Servers that do not send an ETag still get a stable content hash, so
+        # unchanged cards keep their existing AgentCard object.
+        new_etag = response.headers.get("ETag") or f'W/"{hashlib.sha1(response.content).hexdigest()}"'
+        current = self._entries.get(base_url)
+        if current is not None and current.etag == new_etag:
+            current.fetched_at = time.time()
+            current.fetch_seconds = fetch_seconds
+            return current
+
+        entry = CardEntry(
+            card=AgentCard.model_validate(response.json()),
+            etag=new_etag,
+            fetched_at=time.time(),
+            fetch_seconds=fetch_seconds,
+        )
+        self._entries[base_url] = entry
+        logger.info(f"Resolved agent card for {base_url}: {entry.card.name}")
+        return entry
+
+    async def _revalidate_loop(self) -> None:
+        interval = max(1.0, self.ttl_seconds / 4)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.time()
+            stale = [url for url, entry in self._entries.items() if now - entry.fetched_at >= self.ttl_seconds]
+            if not stale:
+                continue
+            results = await asyncio.gather(*(self.revalidate(url) for url in stale), return_exceptions=True)
+            for url, result in zip(stale, results):
+                if isinstance(result, BaseException):
+                    # Keep serving the last good card; it is retried next round
+                    logger.warning(f"Revalidating agent card for {url} failed: {result!r}")
+            self._save_disk_cache()
+
+    def _load_disk_cache(self) -> None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+            for url, raw in data.items():
+                self._entries[url] = CardEntry(
+                    card=AgentCard.model_validate(raw["card"]),
+                    etag=raw.get("etag"),
+                    fetched_at=raw.get("fetched_at", 0.0),
+                    fetch_seconds=raw.get("fetch_seconds", 0.0),
+                )
+            logger.info(f"Loaded {len(data)} agent card(s) from {self.cache_path}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable agent card cache {self.cache_path}: {e}")
+
+    def _save_disk_cache(self) -> None:
+        if not self.cache_path:
+            return
+        data = {
+            url: {
+                "card": entry.card.model_dump(mode="json", by_alias=True, exclude_none=True),
+                "etag": entry.etag,
+                "fetched_at": entry.fetched_at,
+                "fetch_seconds": entry.fetch_seconds,
+            }
+            for url, entry in self._entries.items()
+        }
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.cache_path)
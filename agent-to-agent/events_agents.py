@@ -1,8 +1,5 @@
-from typing import Optional
+from typing import AsyncIterator, Optional
 from agent import logger
-from a2a.server.agent_execution import AgentExecutor, RequestContext
-from a2a.server.events import EventQueue
-from a2a.utils import new_agent_text_message
 from a2a.types import (
     AgentCapabilities,
     AgentCard,
@@ -11,10 +8,12 @@ from a2a.types import (
     SendMessageRequest,
     SendStreamingMessageRequest,
 )
-from a2a.server.tasks import InMemoryTaskStore # Example task store
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.apps import A2AStarletteApplication
 
+from instrumentation import instrument_app
+from streaming_executor import StreamingAgentExecutor
+from task_store import SQLiteTaskStore, close_on_shutdown
 from utils import get_config
 
 config = get_config()
@@ -23,55 +22,22 @@ EVENTS_AGENT_BASE_URL = config['EVENTS_AGENT_BASE_URL']
 
 # EventsInfoAgent: Provides event information
 class EventsInfoAgent:
-    """A simple agent that provides a static event update."""
-    async def get_current_events(self, query: Optional[str] = None) -> str:
+    """A simple agent that provides static event updates."""
+    events = ["Current Event: The annual 'Innovate AI' conference is happening this week!"]
+
+    async def stream_current_events(self, query: Optional[str] = None) -> AsyncIterator[str]:
         # In a real agent, this would involve dynamic logic, API calls, etc.
         logger.info(f"EventsInfoAgent received query: {query}")
-        return "Current Event: The annual 'Innovate AI' conference is happening this week!"
+        for event in self.events:
+            yield event
 
 # EventsInfoAgentExecutor: Implements the A2A AgentExecutor interface
-class EventsInfoAgentExecutor(AgentExecutor):
+class EventsInfoAgentExecutor(StreamingAgentExecutor):
     """Handles A2A requests for the EventsInfoAgent."""
 
     def __init__(self):
-        super().__init__()
         self.agent = EventsInfoAgent()
-        logger.info("EventsInfoAgentExecutor initialized.")
-
-    async def execute(
-        self,
-        context: RequestContext,
-        event_queue: EventQueue,
-    ) -> None:
-        logger.info(f"EventsInfoAgentExecutor executing task: {context.task_id}")
-        if context.request_message:
-            logger.info(f"Request message content: {context.request_message.model_dump_json(indent=2)}")
-
-        query_text = None
-        if context.request_message and context.request_message.message and context.request_message.message.parts:
-            for part in context.request_message.message.parts:
-                if part.kind == 'text' and hasattr(part, 'text'):
-                    query_text = part.text
-                    logger.info(f"Extracted query from message: {query_text}")
-                    break
-
-        try:
-            event_result = await self.agent.get_current_events(query_text)
-            event_queue.enqueue_event(new_agent_text_message(event_result))
-            logger.info(f"EventsInfoAgentExecutor successfully sent event info: {event_result}")
-        except Exception as e:
-            error_message = f"Error in EventsInfoAgentExecutor: {str(e)}"
-            logger.error(error_message, exc_info=True)
-            event_queue.enqueue_event(new_agent_text_message(f"Sorry, an error occurred: {error_message}"))
-        finally:
-            event_queue.enqueue_event(None) # Signal completion
-
-    async def cancel(
-        self, context: RequestContext, event_queue: EventQueue
-    ) -> None:
-        logger.warning(f"EventsInfoAgentExecutor received cancel request for task: {context.task_id}, but cancel is not supported.")
-        event_queue.enqueue_event(new_agent_text_message("Cancel operation is not supported by this agent."))
-        event_queue.enqueue_event(None) # Signal completion
+        super().__init__(stream_fn=self.agent.stream_current_events, skill="get_current_events", artifact_name="events")
 
 logger.info("EventsInfoAgent and EventsInfoAgentExecutor classes defined.")
 
@@ -101,7 +67,12 @@ logger.info(f"Events Agent Card defined: {events_agent_card.name}")
 
 # Instantiate the executor, request handler, and task store
 events_agent_executor = EventsInfoAgentExecutor()
-events_task_store = InMemoryTaskStore()
+events_task_store = SQLiteTaskStore(
+    db_path=f"{config.get('TASK_STORE_DIR', 'task_store')}/events_tasks.db",
+    ttl_seconds=config.get('TASK_TTL_SECONDS', 3600),
+    max_hot_tasks=config.get('TASK_STORE_MAX_HOT_TASKS', 1000),
+    batch_size=config.get('TASK_STORE_BATCH_SIZE', 100),
+)
 events_request_handler = DefaultRequestHandler(
     agent_executor=events_agent_executor,
     task_store=events_task_store,
@@ -111,6 +82,7 @@ events_request_handler = DefaultRequestHandler(
 events_agent_server_app = A2AStarletteApplication(
     agent_card=events_agent_card,
     http_handler=events_request_handler,
-).build()
+).build(lifespan=close_on_shutdown(events_task_store)) # Flush pending task writes on shutdown
+events_agent_server_app = instrument_app(events_agent_server_app, agent="events") # Adds /metrics
 
 logger.info(f"A2AStarletteApplication for Events Agent created and built.")
@@ -0,0 +1,278 @@
+"""Shared instrumentation for the A2A servers.
+
+- Latency histograms, in-flight gauges, error counters and response cache
+  counters, served in the Prometheus text format on `/metrics` (see
+  `instrument_app` and `register_response_cache`).
+- Sampled, lazily serialized payload logging (`log_payload`), so request
+  bodies are only dumped when DEBUG is on and the request is sampled.
+- Queue-based logging (`configure_async_logging`), so formatting and writing
+  log records happens on a background thread instead of the event loop.
+
+Metrics are per process; with several uvicorn workers, scrape each one.
+"""
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import time
+from typing import Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import BaseRoute, Match
+
+from utils import get_config
+
+config = get_config()
+PAYLOAD_LOG_SAMPLE_RATE = float(config.get('PAYLOAD_LOG_SAMPLE_RATE', 0.01))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_str(labels: tuple) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in labels)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{{{_label_str(key)}}} {value}" for key, value in self.values.items()]
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # labels -> [count per bucket..., +Inf count], sum
+        self.values: dict[tuple, tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        counts, total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        self.values[key] = (counts, total + value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in self.values.items():
+            labels = _label_str(key)
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram("a2a_request_duration_seconds", "HTTP request latency by agent and path.")
+REQUESTS_IN_FLIGHT = Gauge("a2a_requests_in_flight", "HTTP requests currently being served.")
+REQUEST_ERRORS = Counter("a2a_request_errors_total", "HTTP requests that failed or returned 5xx.")
+SKILL_LATENCY = Histogram("a2a_skill_duration_seconds", "Executor latency by skill.")
+SKILLS_IN_FLIGHT = Gauge("a2a_skills_in_flight", "Executor runs currently in progress.")
+SKILL_ERRORS = Counter("a2a_skill_errors_total", "Executor runs that ended in an error.")
+SKILL_CANCELLED = Counter("a2a_skill_cancelled_total", "Executor runs cancelled or stopped at their deadline.")
+
+METRICS = [REQUEST_LATENCY, REQUESTS_IN_FLIGHT, REQUEST_ERRORS, SKILL_LATENCY, SKILLS_IN_FLIGHT, SKILL_ERRORS, SKILL_CANCELLED]
+
+# ResponseCache.metrics() field -> (metric name, type, help)
+RESPONSE_CACHE_METRICS = {
+    "hits": ("a2a_response_cache_hits_total", "counter", "Lookups answered from a fresh cache entry."),
+    "stale_hits": ("a2a_response_cache_stale_hits_total", "counter", "Lookups answered from a stale entry while it refreshed."),
+    "misses": ("a2a_response_cache_misses_total", "counter", "Lookups that had to wait for the upstream stream."),
+    "coalesced": ("a2a_response_cache_coalesced_total", "counter", "Misses that joined an in-flight stream instead of starting one."),
+    "abandoned": ("a2a_response_cache_abandoned_total", "counter", "Upstream streams cancelled after every caller left."),
+    "entries": ("a2a_response_cache_entries", "gauge", "Queries currently cached."),
+}
+
+# skill -> ResponseCache, read at scrape time
+_response_caches: dict[str, object] = {}
+
+
+def register_response_cache(skill: str, cache) -> None:
+    """Serve `cache.metrics()` on /metrics, labelled with `skill`."""
+    _response_caches[skill] = cache
+
+
+def _render_response_caches() -> list[str]:
+    snapshots = {skill: cache.metrics() for skill, cache in _response_caches.items()}
+    lines = []
+    for field, (name, kind, help_text) in RESPONSE_CACHE_METRICS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{skill="{skill}"}} {metrics[field]}' for skill, metrics in snapshots.items()]
+    return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(_render_response_caches())
+    return "\n".join(lines) + "\n"
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight and error metrics per request.
+
+    Requests are labelled with the path template of the route they match, and
+    paths no route matches share the label "other", so arbitrary URLs (scanners,
+    typos) cannot add series without bound.
+    """
+
+    def __init__(self, app, agent: str, routes: list[BaseRoute]):
+        self.app = app
+        self.agent = agent
+        self.routes = routes
+
+    def route_label(self, scope) -> str:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                return getattr(route, "path", "other")
+        return "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        path = self.route_label(scope)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(agent=self.agent)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            REQUEST_ERRORS.inc(agent=self.agent, path=path)
+            raise
+        else:
+            if status >= 500:
+                REQUEST_ERRORS.inc(agent=self.agent, path=path)
+        finally:
+            # Streaming responses are timed until the last chunk is sent
+            REQUEST_LATENCY.observe(time.perf_counter() - start, agent=self.agent, path=path)
+            REQUESTS_IN_FLIGHT.dec(agent=self.agent)
+
+
+def instrument_app(app: Starlette, agent: str) -> Starlette:
+    """Add the `/metrics` route and request metrics to a built A2A app."""
+    app.add_route("/metrics", metrics_endpoint, methods=["GET"])
+    app.add_middleware(MetricsMiddleware, agent=agent, routes=app.routes)
+    return app
+
+
+class SkillTimer:
+    """Context manager timing one executor run of `skill`."""
+
+    def __init__(self, skill: str):
+        self.skill = skill
+
+    def __enter__(self) -> "SkillTimer":
+        SKILLS_IN_FLIGHT.inc(skill=self.skill)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        SKILL_LATENCY.observe(time.perf_counter() - self.start, skill=self.skill)
+        SKILLS_IN_FLIGHT.dec(skill=self.skill)
+        if exc_type is not None and issubclass(exc_type, asyncio.CancelledError):
+            self.cancelled("cancel")
+        elif exc_type is not None:
+            SKILL_ERRORS.inc(skill=self.skill)
+
+    def error(self) -> None:
+        """Count a failure that was handled inside the block."""
+        SKILL_ERRORS.inc(skill=self.skill)
+
+    def cancelled(self, reason: str) -> None:
+        """Count a run that was aborted (`reason` is "cancel" or "deadline")."""
+        SKILL_CANCELLED.inc(skill=self.skill, reason=reason)
+
+
+class _LazyJson:
+    """Defers model_dump_json until a handler actually formats the record."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def __str__(self) -> str:
+        return self.model.model_dump_json()
+
+
+def log_payload(logger: logging.Logger, label: str, model, sample_rate: Optional[float] = None) -> None:
+    """Log a pydantic payload at DEBUG for a sample of requests."""
+    if model is None or not logger.isEnabledFor(logging.DEBUG):
+        return
+    if random.random() >= (PAYLOAD_LOG_SAMPLE_RATE if sample_rate is None else sample_rate):
+        return
+    logger.debug("%s: %s", label, _LazyJson(model))
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that enqueues records untouched.
+
+    The stock handler formats the message before enqueueing, which would put
+    the formatting work (and any lazy payload dumps) back on the caller.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_async_logging(logger: Optional[logging.Logger] = None) -> logging.handlers.QueueListener:
+    """Move `logger`'s (default: root) handlers behind a queue drained by a thread.
+
+    Log calls on the event loop then only enqueue the record; formatting and
+    I/O happen on the listener thread.
+    """
+    logger = logger or logging.getLogger()
+    handlers = [h for h in logger.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+    log_queue: queue.Queue = queue.Queue(-1)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(_RecordQueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
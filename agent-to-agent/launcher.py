@@ -0,0 +1,107 @@
+"""Co-host the News and Events agents (plus the TLDR orchestrator) in one ASGI process.
+
+Each agent's A2A app is mounted under its own path (/news/, /events/) and the
+orchestrator is exposed at /tldr and /tldr/stream. When COHOST_IN_PROCESS is
+on, the orchestrator reaches the co-located agents through InProcessA2AClient,
+so a TLDR costs no HTTP round trips or JSON-RPC serialization. Remote callers
+can still use the mounted A2A endpoints as usual.
+
+Scale out by running several worker processes:
+
+    python launcher.py --port 9000 --workers 4
+
+or, with uvicorn directly (the app is only built by the factory, so
+importing this module has no side effects):
+
+    uvicorn launcher:build_app --factory --port 9000
+"""
+import argparse
+from contextlib import asynccontextmanager
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from a2a.server.apps import A2AStarletteApplication
+
+from agent import UserFacingAgent, logger
+from events_agents import events_agent_card, events_request_handler
+from instrumentation import instrument_app, metrics_endpoint
+from news_agent import news_agent_card, news_request_handler
+from task_store import close_on_shutdown
+from transport import register_local_agent, unregister_local_agent
+from utils import get_config
+
+config = get_config()
+COHOST_BASE_URL = config.get('COHOST_BASE_URL', 'http://localhost:9000')
+COHOST_IN_PROCESS = config.get('COHOST_IN_PROCESS', True)
+
+# mount path -> (TLDR section, agent card, request handler)
+COHOSTED_AGENTS = {
+    "news": ("News", news_agent_card, news_request_handler),
+    "events": ("Events", events_agent_card, events_request_handler),
+}
+
+
+def build_app(base_url: str = COHOST_BASE_URL, in_process: bool = COHOST_IN_PROCESS) -> Starlette:
+    """Mount every co-hosted agent under one Starlette app.
+
+    Each agent gets its own copy of its card advertising the mounted RPC
+    endpoint, so the module-level cards are left untouched. In-process agents
+    are registered with the transport only while the app is running.
+
+    Mounted apps do not get lifespan events, so this app flushes and closes
+    the agents' task stores on shutdown.
+    """
+    routes = []
+    agent_urls = {}
+    handlers = {}
+    for path, (section, card, request_handler) in COHOSTED_AGENTS.items():
+        url = f"{base_url.rstrip('/')}/{path}/"
+        agent_app = A2AStarletteApplication(
+            agent_card=card.model_copy(update={"url": url}),
+            http_handler=request_handler,
+        ).build()
+        routes.append(Mount(f"/{path}", app=instrument_app(agent_app, agent=path)))
+        agent_urls[section] = url
+        handlers[url] = request_handler
+
+    user_facing_agent = None
+    close_task_stores = close_on_shutdown(*(handler.task_store for handler in handlers.values()))
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        nonlocal user_facing_agent
+        if in_process:
+            for url, request_handler in handlers.items():
+                register_local_agent(url, request_handler)
+        try:
+            async with close_task_stores(app), UserFacingAgent(agent_urls=agent_urls) as user_facing_agent:
+                yield
+        finally:
+            if in_process:
+                for url in handlers:
+                    unregister_local_agent(url)
+
+    async def tldr(request: Request) -> PlainTextResponse:
+        query = request.query_params.get("q", "What should I know today?")
+        return PlainTextResponse(await user_facing_agent.get_tldr(query))
+
+    async def tldr_stream(request: Request) -> StreamingResponse:
+        query = request.query_params.get("q", "What should I know today?")
+        lines = (f"{line}\n" async for line in user_facing_agent.stream_tldr(query))
+        return StreamingResponse(lines, media_type="text/plain")
+
+    logger.info(f"Co-hosting {', '.join(agent_urls)} agents at {base_url} (in-process: {in_process})")
+    return Starlette(routes=[Route("/tldr", tldr), Route("/tldr/stream", tldr_stream), Route("/metrics", metrics_endpoint), *routes], lifespan=lifespan)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run several A2A agents in one ASGI process")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each hosting every agent")
+    args = parser.parse_args()
+
+    uvicorn.run("launcher:build_app", factory=True, host=args.host, port=args.port, workers=args.workers)
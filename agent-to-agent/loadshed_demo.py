@@ -0,0 +1,127 @@
+"""Show that abandoned A2A requests stop using capacity.
+
+Registers a deliberately slow agent in-process and drives it through
+UserFacingAgent with a short timeout, in three rounds:
+
+    send        get_tldr gives up; the deadline in the request metadata stops
+                the downstream work
+    stream      stream_tldr gives up; the orchestrator sends tasks/cancel and
+                cancel() aborts the work
+    expired     requests arrive after their deadline and are dropped without
+                starting any work
+
+After each round it prints how much work is still in flight (executor tasks,
+running upstream streams, the a2a_skills_in_flight gauge), which should all be
+back to zero shortly after the orchestrator gives up.
+
+Usage:
+    python loadshed_demo.py --requests 50 --timeout 0.5 --item-seconds 2
+"""
+import argparse
+import asyncio
+import time
+from typing import AsyncIterator, Optional
+
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import SendMessageRequest
+
+from agent import UserFacingAgent
+from instrumentation import SKILL_CANCELLED, SKILLS_IN_FLIGHT
+from streaming_executor import StreamingAgentExecutor
+from transport import InProcessA2AClient, register_local_agent
+
+SLOW_AGENT_URL = "local://slow"
+SKILL = "slow_lookup"
+
+
+class SlowAgent:
+    """Yields `items` results, each taking `item_seconds` to produce."""
+
+    def __init__(self, items: int, item_seconds: float):
+        self.items = items
+        self.item_seconds = item_seconds
+        self.active = 0
+        self.produced = 0
+
+    async def stream(self, query: Optional[str] = None) -> AsyncIterator[str]:
+        self.active += 1
+        try:
+            for i in range(self.items):
+                await asyncio.sleep(self.item_seconds)
+                self.produced += 1
+                yield f"result {i} for {query}"
+        finally:
+            self.active -= 1
+
+
+def snapshot(agent: SlowAgent, executor: StreamingAgentExecutor) -> dict:
+    return {
+        "executor_tasks": len(executor.running),
+        "upstream_streams": agent.active,
+        "skills_in_flight": SKILLS_IN_FLIGHT.values.get((("skill", SKILL),), 0),
+        "items_produced": agent.produced,
+    }
+
+
+async def settle(agent: SlowAgent, executor: StreamingAgentExecutor, limit: float = 2.0) -> float:
+    """Wait until no work is left in flight; return how long that took."""
+    start = time.perf_counter()
+    while executor.running or agent.active:
+        if time.perf_counter() - start > limit:
+            break
+        await asyncio.sleep(0.01)
+    return time.perf_counter() - start
+
+
+async def run_round(name: str, requests: int, agent: SlowAgent, executor: StreamingAgentExecutor, drive) -> None:
+    start = time.perf_counter()
+    await asyncio.gather(*(drive(i) for i in range(requests)))
+    gave_up = time.perf_counter() - start
+    at_give_up = snapshot(agent, executor)
+    freed_after = await settle(agent, executor)
+    print(f"{name}: orchestrator gave up after {gave_up:.2f}s")
+    print(f"  in flight when it gave up: {at_give_up}")
+    print(f"  in flight {freed_after:.2f}s later:   {snapshot(agent, executor)}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Deadline propagation and cancellation demo")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=0.5, help="Orchestrator timeout per agent call")
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--item-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    agent = SlowAgent(args.items, args.item_seconds)
+    executor = StreamingAgentExecutor(stream_fn=agent.stream, skill=SKILL, artifact_name="slow")
+    handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+    register_local_agent(SLOW_AGENT_URL, handler)
+    full_run = args.items * args.item_seconds
+    print(f"Each request needs {full_run:.1f}s of work; the orchestrator waits {args.timeout:.1f}s")
+
+    # Resilience off: an open circuit breaker would skip the slow agent entirely
+    async with UserFacingAgent(agent_urls={"Slow": SLOW_AGENT_URL}, timeout=args.timeout, resilient=False) as user_facing_agent:
+        await run_round(
+            "send", args.requests, agent, executor,
+            lambda i: user_facing_agent.get_tldr(f"send #{i}"),
+        )
+
+        async def stream_one(i: int) -> None:
+            async for _line in user_facing_agent.stream_tldr(f"stream #{i}"):
+                pass
+        await run_round("stream", args.requests, agent, executor, stream_one)
+
+        client = InProcessA2AClient(handler)
+
+        async def expired_one(i: int) -> None:
+            params = user_facing_agent.message_params(f"expired #{i}", deadline=time.time() - 1)
+            await client.send_message(SendMessageRequest(id=str(i), params=params))
+        await run_round("expired", args.requests, agent, executor, expired_one)
+
+    print(f"a2a_skill_cancelled_total: {dict(SKILL_CANCELLED.values)}")
+    print(f"Items produced: {agent.produced} (a run without cancellation would produce {3 * args.requests * args.items})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,5 @@
-from typing import Optional
-from a2a import logger
-from a2a.server.agent_execution import AgentExecutor, RequestContext
-from a2a.server.events import EventQueue
-from a2a.utils import new_agent_text_message
+from typing import AsyncIterator, Optional
+from agent import logger
 from a2a.types import (
     AgentCapabilities,
     AgentCard,
@@ -11,10 +8,12 @@ from a2a.types import (
     SendMessageRequest,
     SendStreamingMessageRequest,
 )
-from a2a.server.tasks import InMemoryTaskStore # Example task store
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.apps import A2AStarletteApplication
 
+from instrumentation import instrument_app
+from streaming_executor import StreamingAgentExecutor
+from task_store import SQLiteTaskStore, close_on_shutdown
 from utils import get_config
 
 config = get_config()
@@ -22,56 +21,24 @@ NEWS_AGENT_BASE_URL = config['NEWS_AGENT_BASE_URL']
 
 # NewsInfoAgent: Provides news information
 class NewsInfoAgent:
-    """A simple agent that provides a static news headline."""
-    async def get_latest_news(self, query: Optional[str] = None) -> str:
+    """A simple agent that provides static news headlines."""
+    headlines = ["Breaking News: AI discovers a new way to make coffee!"]
+
+    async def stream_latest_news(self, query: Optional[str] = None) -> AsyncIterator[str]:
         # In a real agent, this would involve dynamic logic, API calls, etc.
-        # The query parameter could be used to tailor the news.
+        # The query parameter could be used to tailor the news. Each headline
+        # is yielded as soon as it is available.
         logger.info(f"NewsInfoAgent received query: {query}")
-        return "Breaking News: AI discovers a new way to make coffee!"
+        for headline in self.headlines:
+            yield headline
 
 
-class NewsInfoAgentExecutor(AgentExecutor):
+class NewsInfoAgentExecutor(StreamingAgentExecutor):
     """Handles A2A requests for the NewsInfoAgent."""
 
     def __init__(self):
-        super().__init__()
         self.agent = NewsInfoAgent()
-        logger.info("NewsInfoAgentExecutor initialized.")
-
-    async def execute(
-        self,
-        context: RequestContext,
-        event_queue: EventQueue,
-    ) -> None:
-        logger.info(f"NewsInfoAgentExecutor executing task: {context.task_id}")
-        if context.request_message:
-            logger.info(f"Request message content: {context.request_message.model_dump_json(indent=2)}")
-
-        query_text = None
-        if context.request_message and context.request_message.message and context.request_message.message.parts:
-            for part in context.request_message.message.parts:
-                if part.kind == 'text' and hasattr(part, 'text'):
-                    query_text = part.text
-                    logger.info(f"Extracted query from message: {query_text}")
-                    break
-
-        try:
-            news_result = await self.agent.get_latest_news(query_text)
-            event_queue.enqueue_event(new_agent_text_message(news_result))
-            logger.info(f"NewsInfoAgentExecutor successfully sent news: {news_result}")
-        except Exception as e:
-            error_message = f"Error in NewsInfoAgentExecutor: {str(e)}"
-            logger.error(error_message, exc_info=True)
-            event_queue.enqueue_event(new_agent_text_message(f"Sorry, an error occurred: {error_message}"))
-        finally:
-            event_queue.enqueue_event(None)  # Signal completion
-
-    async def cancel(
-        self, context: RequestContext, event_queue: EventQueue
-    ) -> None:
-        logger.warning(f"NewsInfoAgentExecutor received cancel request for task: {context.task_id}, but cancel is not supported.")
-        event_queue.enqueue_event(new_agent_text_message("Cancel operation is not supported by this agent."))
-        event_queue.enqueue_event(None)  # Signal completion
+        super().__init__(stream_fn=self.agent.stream_latest_news, skill="get_latest_news", artifact_name="news")
 
 news_skill = AgentSkill(
     id='get_latest_news',
@@ -98,7 +65,12 @@ logger.info(f"News Agent Card defined: {news_agent_card.name}")
 
 # Instantiate the executor, request handler, and task store
 news_agent_executor = NewsInfoAgentExecutor()
-news_task_store = InMemoryTaskStore()
+news_task_store = SQLiteTaskStore(
+    db_path=f"{config.get('TASK_STORE_DIR', 'task_store')}/news_tasks.db",
+    ttl_seconds=config.get('TASK_TTL_SECONDS', 3600),
+    max_hot_tasks=config.get('TASK_STORE_MAX_HOT_TASKS', 1000),
+    batch_size=config.get('TASK_STORE_BATCH_SIZE', 100),
+)
 news_request_handler = DefaultRequestHandler(
     agent_executor=news_agent_executor,
     task_store=news_task_store,
@@ -109,7 +81,8 @@ news_agent_server_app = A2AStarletteApplication(
     agent_card=news_agent_card,
     http_handler=news_request_handler,
     # extended_agent_card can be provided if supportsAuthenticatedExtendedCard is True
-).build() # .build() returns the Starlette app instance
+).build(lifespan=close_on_shutdown(news_task_store)) # .build() returns the Starlette app instance; pending task writes are flushed on shutdown
+news_agent_server_app = instrument_app(news_agent_server_app, agent="news") # Adds /metrics
 
 logger.info(f"A2AStarletteApplication for News Agent created and built.")
 
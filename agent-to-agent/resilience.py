@@ -0,0 +1,229 @@
+"""Tail-latency protection for calls from the orchestrator to downstream agents.
+
+`AgentCallPolicy` wraps every call to one agent with:
+
+- an adaptive timeout: a multiple of the agent's recent p99 latency, clamped
+  between a floor and the configured maximum;
+- a hedged request: if the first attempt has not answered by the agent's
+  recent p95 (configurable), a second identical attempt is started and
+  whichever finishes first wins, the other one is cancelled (and its outcome
+  retrieved, so a failed loser is not reported as an unretrieved exception);
+- a circuit breaker: after `failure_threshold` consecutive failures the agent
+  is skipped for `reset_seconds`, then a single probe call decides whether to
+  close the circuit again (half-open).
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an agent whose circuit is open."""
+
+
+def retrieve_exception(future: asyncio.Future) -> None:
+    """Done callback marking the outcome of a future nobody awaits as retrieved."""
+    if not future.cancelled():
+        future.exception()
+
+
+class LatencyTracker:
+    """Rolling window of recent successful call latencies (seconds)."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples: deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency at quantile `q`, or None until enough samples were seen."""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (at most one probe while half-open)."""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("Circuit closed after a successful probe")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit opened after {self.failures} failure(s)")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+class AgentCallPolicy:
+    """Adaptive timeout, hedging and circuit breaking for one downstream agent."""
+
+    def __init__(
+        self,
+        max_timeout: float,
+        min_timeout: float = 0.5,
+        timeout_multiplier: float = 3.0,
+        hedge_percentile: Optional[float] = 0.95,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        self.max_timeout = max_timeout
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.hedge_percentile = hedge_percentile
+        self.latency = LatencyTracker(window=window, min_samples=min_samples)
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_seconds=reset_seconds)
+
+        # Metrics
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.rejected = 0
+
+    def timeout(self) -> float:
+        p99 = self.latency.percentile(0.99)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self) -> Optional[float]:
+        if self.hedge_percentile is None:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    async def call(self, attempt: Callable[[float], Awaitable]):
+        """Run `attempt(timeout)` under this policy and return its result.
+
+        `attempt` may be started twice (hedging), so it must be safe to
+        repeat, as read-only agent queries are.
+        """
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise CircuitOpenError("circuit open")
+        self.calls += 1
+        timeout = self.timeout()
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._hedged(attempt, timeout), timeout)
+        except TimeoutError:
+            self.record_timeout(timeout)
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            # The caller gave up; that says nothing about the agent, free a pending probe
+            self.breaker.probing = False
+            raise
+        self.latency.record(time.perf_counter() - start)
+        self.breaker.record_success()
+        return result
+
+    def record_timeout(self, timeout: float) -> None:
+        # Count the timeout as a (lower bound) latency sample, so an agent that
+        # became slower raises its adaptive timeout instead of failing forever
+        self.latency.record(timeout)
+        self.breaker.record_failure()
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[float]:
+        """Circuit breaker and adaptive timeout, without hedging, for a streaming call.
+
+        Yields the timeout that applies to the block.
+        """
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise CircuitOpenError("circuit open")
+        self.calls += 1
+        timeout = self.timeout()
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                yield timeout
+        except TimeoutError:
+            self.record_timeout(timeout)
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            self.breaker.probing = False
+            raise
+        self.latency.record(time.perf_counter() - start)
+        self.breaker.record_success()
+
+    async def _hedged(self, attempt: Callable[[float], Awaitable], timeout: float):
+        primary = asyncio.ensure_future(attempt(timeout))
+        delay = self.hedge_delay()
+        attempts = [primary]
+        started = [primary]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                self.hedges += 1
+                attempts.append(asyncio.ensure_future(attempt(timeout)))
+                started.append(attempts[-1])
+            while True:
+                done, _ = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((a for a in done if not a.cancelled() and a.exception() is None), None)
+                if winner is not None:
+                    if winner is not primary:
+                        self.hedge_wins += 1
+                    return winner.result()
+                attempts = [a for a in attempts if a not in done]
+                if not attempts:
+                    # Every attempt failed; surface the primary's error
+                    return primary.result()
+        finally:
+            for a in started:
+                a.cancel()
+                a.add_done_callback(retrieve_exception)
+
+    def metrics(self) -> dict:
+        return {
+            "state": self.breaker.state,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "timeout_seconds": self.timeout(),
+            "hedge_delay_seconds": self.hedge_delay(),
+        }
@@ -0,0 +1,132 @@
+"""Show hedging, circuit breaking and partial TLDRs against stub agents.
+
+Three in-process stub agents with injected latency and failures:
+
+    Tail     usually answers in ~20 ms, but 5% of calls take 1 s
+    Flaky    fast, but down for the middle third of the run
+    Stuck    answers only after 5 s
+
+The same open-loop TLDR workload (a fixed arrival rate, so both runs see the
+same outage window) runs once with resilience off (fixed timeout and no
+overall budget, as before) and once with AgentCallPolicy and the TLDR budget
+on. It prints the TLDR latency percentiles, how
+often each section was missing and each agent's policy metrics.
+
+Each attempt does its own work, as if the agent ran as several replicas
+behind a load balancer, so a hedged request is not coalesced with the slow
+one by the agent's response cache.
+
+Usage:
+    python resilience_demo.py --requests 300 --rate 50
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from typing import AsyncIterator, Optional
+
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
+from a2a.types import Part, TextPart
+
+from agent import UserFacingAgent
+from streaming_executor import StreamingAgentExecutor
+from transport import register_local_agent
+
+
+class StubAgent:
+    def __init__(self, name: str, latency: float, tail_latency: float = 0.0, tail_ratio: float = 0.0):
+        self.name = name
+        self.latency = latency
+        self.tail_latency = tail_latency
+        self.tail_ratio = tail_ratio
+        self.failing = False
+
+    async def stream(self, query: Optional[str] = None) -> AsyncIterator[str]:
+        slow = random.random() < self.tail_ratio
+        await asyncio.sleep(self.tail_latency if slow else self.latency)
+        if self.failing:
+            raise RuntimeError(f"{self.name} is down")
+        yield f"{self.name} says hi"
+
+
+class UncachedExecutor(StreamingAgentExecutor):
+    """StreamingAgentExecutor without the response cache, so every attempt does the work."""
+
+    async def stream_artifact(self, updater: TaskUpdater, query_text: Optional[str]) -> int:
+        sent = 0
+        async for item in self.stream_fn(query_text):
+            await updater.add_artifact([Part(root=TextPart(text=item))], name=self.artifact_name, append=sent > 0)
+            sent += 1
+        return sent
+
+
+def register_stubs(run: str, agents: list[StubAgent]) -> dict[str, str]:
+    urls = {}
+    for agent in agents:
+        url = f"local://{run}/{agent.name.lower()}"
+        executor = UncachedExecutor(stream_fn=agent.stream, skill=agent.name.lower(), artifact_name=agent.name.lower())
+        register_local_agent(url, DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore()))
+        urls[agent.name] = url
+    return urls
+
+
+async def run(resilient: bool, requests: int, rate: float, timeout: float, reset_seconds: float, budget: float) -> None:
+    tail = StubAgent("Tail", latency=0.02, tail_latency=1.0, tail_ratio=0.05)
+    flaky = StubAgent("Flaky", latency=0.02)
+    stuck = StubAgent("Stuck", latency=5.0)
+    agent_urls = register_stubs("resilient" if resilient else "baseline", [tail, flaky, stuck])
+    duration = requests / rate
+
+    latencies = []
+    missing = {name: 0 for name in agent_urls}
+
+    # Without resilience the budget is the per-agent timeout, so get_tldr waits for every agent as before
+    budget = budget if resilient else timeout
+    async with UserFacingAgent(agent_urls=agent_urls, timeout=timeout, resilient=resilient, budget=budget) as user_facing_agent:
+        for policy in user_facing_agent.policies.values():
+            policy.breaker.reset_seconds = reset_seconds  # Short run, so probe sooner than the configured value
+
+        async def one(i: int) -> None:
+            start = time.perf_counter()
+            tldr = await user_facing_agent.get_tldr(f"request #{i}")
+            latencies.append(time.perf_counter() - start)
+            for name in agent_urls:
+                missing[name] += f"- {name}: unavailable" in tldr
+
+        run_start = time.perf_counter()
+        pending = []
+        for i in range(requests):
+            elapsed = time.perf_counter() - run_start
+            flaky.failing = duration / 3 <= elapsed < 2 * duration / 3
+            pending.append(asyncio.ensure_future(one(i)))
+            await asyncio.sleep(max(0.0, (i + 1) / rate - (time.perf_counter() - run_start)))
+        await asyncio.gather(*pending)
+        metrics = {name: user_facing_agent.policies[url].metrics() for name, url in agent_urls.items()} if resilient else {}
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+    print(f"\nresilience {'on' if resilient else 'off'}:")
+    print(f"  TLDR latency p50 {pick(0.5):.0f} ms, p95 {pick(0.95):.0f} ms, p99 {pick(0.99):.0f} ms")
+    print(f"  sections missing out of {requests} TLDRs: {missing}")
+    for name, agent_metrics in metrics.items():
+        print(f"  {name}: {agent_metrics}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Hedging / circuit breaker demo with stub agents")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rate", type=float, default=50, help="TLDR requests started per second")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Maximum per-agent timeout")
+    parser.add_argument("--reset-seconds", type=float, default=1.0, help="Circuit breaker open time")
+    parser.add_argument("--budget", type=float, default=0.5, help="Whole-TLDR budget with resilience on")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.CRITICAL)  # Failures are injected on purpose
+
+    await run(False, args.requests, args.rate, args.timeout, args.reset_seconds, args.budget)
+    await run(True, args.requests, args.rate, args.timeout, args.reset_seconds, args.budget)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class StreamFlight:
+    """One upstream stream shared by every caller asking for the same query."""
+
+    def __init__(self, background: bool = False) -> None:
+        self.items: list = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.condition = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+        # Callers currently reading the stream. A flight started for callers
+        # (not a background refresh) is cancelled once they have all left.
+        self.subscribers = 0
+        self.background = background
+
+
+class ResponseCache:
+    """Query-keyed cache for streamed agent results such as the news headlines.
+
+    - `stream()` replays a cached result at once. Entries are fresh for
+      `ttl_seconds`; after that they are still served for up to
+      `stale_seconds` while a background refresh runs
+      (stale-while-revalidate).
+    - Callers joining an in-flight stream get each item as soon as the
+      upstream produces it.
+    - Concurrent misses for the same normalized query share one upstream
+      call (single-flight), so a burst of identical requests costs one fetch.
+      A shared stream is cancelled when every caller reading it has gone
+      away, so abandoned requests stop consuming upstream capacity.
+    - At most `max_entries` queries are kept (LRU).
+    """
+
+    def __init__(self, ttl_seconds: float = 120, stale_seconds: float = 600, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._flights: dict[str, StreamFlight] = {}
+
+        # Metrics
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    @staticmethod
+    def normalize(query: Optional[str]) -> str:
+        return " ".join((query or "").lower().split())
+
+    async def stream(
+        self, query: Optional[str], stream_fn: Callable[[Optional[str]], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        """Yield the items of `stream_fn(query)`, cached as a list once complete."""
+        key = self.normalize(query)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None and now < entry.stale_until:
+            if now < entry.fresh_until:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                if key not in self._flights:
+                    self._start_flight(key, query, stream_fn, background=True)
+            self._entries.move_to_end(key)
+            for item in entry.value:
+                yield item
+            return
+
+        self.misses += 1
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+        else:
+            flight = self._start_flight(key, query, stream_fn)
+
+        seen = 0
+        flight.subscribers += 1
+        try:
+            while True:
+                async with flight.condition:
+                    await flight.condition.wait_for(lambda: len(flight.items) > seen or flight.done)
+                    new_items = flight.items[seen:]
+                    done, error = flight.done, flight.error
+                for item in new_items:
+                    yield item
+                seen += len(new_items)
+                if done:
+                    if error is not None:
+                        raise error
+                    return
+        finally:
+            flight.subscribers -= 1
+            if not flight.subscribers and not flight.done and not flight.background:
+                self._abandon_flight(key, flight)
+
+    def put(self, query: Optional[str], value: Any) -> None:
+        key = self.normalize(query)
+        now = time.monotonic()
+        self._entries[key] = CacheEntry(
+            value=value,
+            fresh_until=now + self.ttl_seconds,
+            stale_until=now + self.ttl_seconds + self.stale_seconds,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+    def _start_flight(self, key: str, query: Optional[str], stream_fn, background: bool = False) -> StreamFlight:
+        flight = StreamFlight(background=background)
+        self._flights[key] = flight
+
+        async def pump():
+            try:
+                async for item in stream_fn(query):
+                    async with flight.condition:
+                        flight.items.append(item)
+                        flight.condition.notify_all()
+                self.put(query, list(flight.items))
+            except asyncio.CancelledError:
+                flight.error = RuntimeError(f"Upstream stream for {key!r} was cancelled")
+                raise
+            except Exception as e:
+                flight.error = e
+                logger.warning(f"Upstream stream for {key!r} failed: {e!r}")
+            finally:
+                if self._flights.get(key) is flight:
+                    self._flights.pop(key)
+                async with flight.condition:
+                    flight.done = True
+                    flight.condition.notify_all()
+
+        # Runs independently of the callers, so a disconnecting caller does
+        # not abort the fetch everyone else (and the cache) is waiting on;
+        # it is only cancelled once the last caller has left.
+        flight.task = asyncio.ensure_future(pump())
+        return flight
+
+    def _abandon_flight(self, key: str, flight: StreamFlight) -> None:
+        """Cancel a stream nobody is reading any more."""
+        if self._flights.get(key) is flight:
+            self._flights.pop(key)  # Later callers start a fresh flight
+        if flight.task is not None:
+            flight.task.cancel()
+        self.abandoned += 1
+
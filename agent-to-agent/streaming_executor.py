@@ -0,0 +1,144 @@
+import asyncio
+import time
+import uuid
+from typing import AsyncIterator, Callable, Optional
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import Part, TextPart
+from a2a.utils import new_agent_text_message, new_task
+
+from agent import DEADLINE_METADATA_KEY, logger
+from instrumentation import SkillTimer, log_payload, register_response_cache
+from response_cache import ResponseCache
+from utils import get_config
+
+config = get_config()
+
+
+class StreamingAgentExecutor(AgentExecutor):
+    """Shared A2A executor for agents that produce their result as a stream.
+
+    `stream_fn(query)` is an async generator. Every item it yields is
+    published right away as a chunk of one text artifact, so streaming
+    clients see the first item as soon as it exists instead of after all the
+    work is done. Non-streaming clients still receive the whole artifact in
+    the final Task.
+
+    The work for each task runs as its own asyncio task, tracked by task_id:
+    it is stopped when the request's deadline (the `deadline` key of the
+    MessageSendParams metadata, set by the caller) passes or when `cancel()`
+    is called, so abandoned requests stop using capacity.
+    """
+
+    def __init__(self, stream_fn: Callable[[Optional[str]], AsyncIterator[str]], skill: str, artifact_name: str):
+        super().__init__()
+        self.stream_fn = stream_fn
+        self.skill = skill
+        self.artifact_name = artifact_name
+        # Results only change every few minutes, so identical queries share one fetch
+        self.cache = ResponseCache(
+            ttl_seconds=config.get('RESPONSE_CACHE_TTL_SECONDS', 120),
+            stale_seconds=config.get('RESPONSE_CACHE_STALE_SECONDS', 600),
+        )
+        register_response_cache(skill, self.cache)
+        # task_id -> in-flight work for that task
+        self.running: dict[str, asyncio.Task] = {}
+        logger.info(f"{type(self).__name__} initialized.")
+
+    def get_query(self, context: RequestContext) -> Optional[str]:
+        if context.message and context.message.parts:
+            for part in context.message.parts:
+                if part.root.kind == 'text':
+                    logger.info(f"Extracted query from message: {part.root.text}")
+                    return part.root.text
+        return None
+
+    def get_time_left(self, context: RequestContext) -> Optional[float]:
+        """Seconds until the caller's deadline, or None if it did not set one.
+
+        The deadline travels in the request params' metadata (`context.metadata`),
+        not in the message's own metadata.
+        """
+        deadline = context.metadata.get(DEADLINE_METADATA_KEY)
+        if deadline is None:
+            return None
+        return float(deadline) - time.time()
+
+    async def stream_artifact(self, updater: TaskUpdater, query_text: Optional[str]) -> int:
+        """Publish every streamed item as a chunk of one artifact."""
+        artifact_id = str(uuid.uuid4())
+        sent = 0
+        async for item in self.cache.stream(query_text, self.stream_fn):
+            await updater.add_artifact(
+                [Part(root=TextPart(text=item))],
+                artifact_id=artifact_id,
+                name=self.artifact_name,
+                append=sent > 0,
+            )
+            sent += 1
+        return sent
+
+    async def execute(
+        self,
+        context: RequestContext,
+        event_queue: EventQueue,
+    ) -> None:
+        name = type(self).__name__
+        logger.info(f"{name} executing task: {context.task_id}")
+        log_payload(logger, "Request message content", context.message)
+
+        query_text = self.get_query(context)
+
+        task = context.current_task
+        if not task:
+            task = new_task(context.message)
+            await event_queue.enqueue_event(task)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        await updater.start_work()
+
+        time_left = self.get_time_left(context)
+        with SkillTimer(self.skill) as timer:
+            if time_left is not None and time_left <= 0:
+                # The caller has already given up; shed the request without doing the work
+                timer.cancelled("deadline")
+                logger.warning(f"{name} dropping task {task.id}: deadline passed before work started")
+                await updater.failed(new_agent_text_message("Deadline exceeded", task.context_id, task.id))
+                return
+
+            work = asyncio.ensure_future(self.stream_artifact(updater, query_text))
+            self.running[task.id] = work
+            try:
+                sent = await asyncio.wait_for(work, time_left)
+                await updater.complete()
+                logger.info(f"{name} successfully streamed {sent} item(s) for task {task.id}")
+            except TimeoutError:
+                timer.cancelled("deadline")
+                logger.warning(f"{name} stopped task {task.id} at its deadline")
+                await updater.failed(new_agent_text_message("Deadline exceeded", task.context_id, task.id))
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise  # execute() itself was cancelled; wait_for cancelled `work` with it
+                # cancel() aborted the work and has already published the canceled status
+                timer.cancelled("cancel")
+                logger.info(f"{name} cancelled task {task.id}")
+            except Exception as e:
+                timer.error()
+                error_message = f"Error in {name}: {str(e)}"
+                logger.error(error_message, exc_info=True)
+                await updater.failed(
+                    new_agent_text_message(f"Sorry, an error occurred: {error_message}", task.context_id, task.id)
+                )
+            finally:
+                self.running.pop(task.id, None)
+
+    async def cancel(
+        self, context: RequestContext, event_queue: EventQueue
+    ) -> None:
+        logger.info(f"{type(self).__name__} received cancel request for task: {context.task_id}")
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await updater.cancel()
+        work = self.running.get(context.task_id)
+        if work is not None:
+            work.cancel()
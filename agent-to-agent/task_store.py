@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import TaskStore
+from a2a.types import Task
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteTaskStore(TaskStore):
+    """Bounded, persistent replacement for InMemoryTaskStore.
+
+    - Tasks live in SQLite and survive restarts; rows expire after `ttl_seconds`.
+    - Only the `max_hot_tasks` most recently used tasks are kept as objects in
+      memory (LRU), so RSS stays flat however many tasks have been served.
+    - Writes are buffered and flushed in batches (every `batch_size` saves or
+      `flush_interval` seconds) in a single transaction.
+
+    All SQLite access happens on one worker thread, so the event loop never
+    blocks on disk I/O. Call `close()` on shutdown (see `close_on_shutdown`)
+    so the last `flush_interval` of writes reaches disk.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        ttl_seconds: float = 3600,
+        max_hot_tasks: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        purge_interval: float = 60,
+    ) -> None:
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_hot_tasks = max_hot_tasks
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.purge_interval = purge_interval
+
+        self._hot: OrderedDict[str, tuple[Task, float]] = OrderedDict()  # id -> (task, expires_at)
+        self._pending: dict[str, Optional[tuple[str, float]]] = {}  # id -> (json, expires_at), None = delete
+        self._flushing: dict[str, Optional[tuple[str, float]]] = {}  # batch currently being written
+        self._lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()  # one batch in flight; savers wait on it (backpressure)
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_purge = time.time()
+        self._closed = False
+
+        self._db_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-store")
+        self._db_thread.submit(self._open).result()
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_expires_at ON tasks (expires_at)")
+        self._conn.commit()
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._db_thread, fn, *args)
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        """Saves or updates a task; the write reaches SQLite with the next batch."""
+        expires_at = time.time() + self.ttl_seconds
+        async with self._lock:
+            self._remember(task, expires_at)
+            self._pending[task.id] = (task.model_dump_json(exclude_none=True), expires_at)
+            flush_now = len(self._pending) >= self.batch_size
+        if flush_now:
+            await self.flush()
+        self._ensure_flusher()
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        """Retrieves a task from the hot set, the pending batch or SQLite."""
+        now = time.time()
+        async with self._lock:
+            hot = self._hot.get(task_id)
+            if hot is not None:
+                task, expires_at = hot
+                if expires_at > now:
+                    self._hot.move_to_end(task_id)
+                    return task
+                del self._hot[task_id]
+            for buffer in (self._pending, self._flushing):
+                if task_id in buffer:
+                    buffered = buffer[task_id]
+                    if buffered is None or buffered[1] <= now:
+                        return None
+                    task = Task.model_validate_json(buffered[0])
+                    self._remember(task, buffered[1])
+                    return task
+
+        row = await self._run(self._select, task_id, now)
+        if row is None:
+            return None
+        task = Task.model_validate_json(row[0])
+        async with self._lock:
+            # A save may have raced with the read; the newer in-memory copy wins
+            if task_id not in self._hot and task_id not in self._pending:
+                self._remember(task, row[1])
+        return task
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        """Deletes a task; the row is removed with the next batch."""
+        async with self._lock:
+            self._hot.pop(task_id, None)
+            self._pending[task_id] = None
+        self._ensure_flusher()
+
+    async def flush(self) -> None:
+        """Write all buffered saves/deletes to SQLite in one transaction."""
+        async with self._flush_lock:
+            async with self._lock:
+                if not self._pending:
+                    return
+                self._flushing, self._pending = self._pending, {}
+            purge = time.time() - self._last_purge >= self.purge_interval
+            if purge:
+                self._last_purge = time.time()
+            try:
+                await self._run(self._write_batch, self._flushing, purge)
+            except Exception:
+                async with self._lock:
+                    # Put the batch back unless newer writes superseded it
+                    self._pending = {**self._flushing, **self._pending}
+                raise
+            finally:
+                self._flushing = {}
+
+    async def close(self) -> None:
+        """Flush buffered writes and close the database (safe to call twice)."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        await self._run(self._conn.close)
+        self._db_thread.shutdown()
+
+    def _remember(self, task: Task, expires_at: float) -> None:
+        self._hot[task.id] = (task, expires_at)
+        self._hot.move_to_end(task.id)
+        while len(self._hot) > self.max_hot_tasks:
+            self._hot.popitem(last=False)
+
+    def _ensure_flusher(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Flushing task store {self.db_path} failed: {e}", exc_info=True)
+
+    def _select(self, task_id: str, now: float) -> Optional[tuple[str, float]]:
+        return self._conn.execute(
+            "SELECT data, expires_at FROM tasks WHERE id = ? AND expires_at > ?", (task_id, now)
+        ).fetchone()
+
+    def _write_batch(self, pending: dict[str, Optional[tuple[str, float]]], purge: bool) -> None:
+        upserts = [(task_id, value[0], value[1]) for task_id, value in pending.items() if value is not None]
+        deletes = [(task_id,) for task_id, value in pending.items() if value is None]
+        with self._conn:
+            if upserts:
+                self._conn.executemany("INSERT OR REPLACE INTO tasks (id, data, expires_at) VALUES (?, ?, ?)", upserts)
+            if deletes:
+                self._conn.executemany("DELETE FROM tasks WHERE id = ?", deletes)
+            if purge:
+                expired = self._conn.execute("DELETE FROM tasks WHERE expires_at <= ?", (time.time(),)).rowcount
+                if expired:
+                    logger.info(f"Purged {expired} expired task(s) from {self.db_path}")
+
+
+def close_on_shutdown(*stores: SQLiteTaskStore):
+    """Starlette lifespan that flushes and closes `stores` when the app stops."""
+
+    @asynccontextmanager
+    async def lifespan(app):
+        try:
+            yield
+        finally:
+            for store in stores:
+                await store.close()
+                logger.info(f"Flushed and closed task store {store.db_path}")
+
+    return lifespan
@@ -0,0 +1,78 @@
+"""Abandoned A2A requests must stop using capacity.
+
+Runs the three rounds of loadshed_demo.py with small numbers against the slow
+in-process agent: get_tldr timing out (the deadline stops the work), stream_tldr
+giving up (tasks/cancel aborts it) and requests that arrive after their
+deadline (dropped before any work starts). After each round, executor tasks,
+upstream streams and the a2a_skills_in_flight gauge must be back to zero, and
+the agent must not have produced a single item: every request is given up long
+before its first item would be ready.
+
+Usage:
+    python test_loadshed.py          # or: python -m pytest test_loadshed.py
+"""
+import asyncio
+import time
+
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import SendMessageRequest
+
+from agent import UserFacingAgent
+from loadshed_demo import SKILL, SlowAgent, settle, snapshot
+from streaming_executor import StreamingAgentExecutor
+from transport import InProcessA2AClient, register_local_agent, unregister_local_agent
+
+REQUESTS = 5
+TIMEOUT = 0.2  # Orchestrator timeout per agent call
+ITEMS = 3
+ITEM_SECONDS = 1.0  # Far longer than TIMEOUT, so no item is ever finished
+SETTLE_SECONDS = 2.0
+
+
+def run_round(name: str, drive) -> None:
+    """Send REQUESTS requests with `drive(user_facing_agent, handler, i)`, then check nothing is left running."""
+    async def main() -> dict:
+        url = f"local://slow-{name}"
+        agent = SlowAgent(ITEMS, ITEM_SECONDS)
+        executor = StreamingAgentExecutor(stream_fn=agent.stream, skill=SKILL, artifact_name="slow")
+        handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+        register_local_agent(url, handler)
+        try:
+            # Resilience off: an open circuit breaker would skip the slow agent entirely
+            async with UserFacingAgent(agent_urls={"Slow": url}, timeout=TIMEOUT, resilient=False) as user_facing_agent:
+                await asyncio.gather(*(drive(user_facing_agent, handler, i) for i in range(REQUESTS)))
+                await settle(agent, executor, limit=SETTLE_SECONDS)
+                return snapshot(agent, executor)
+        finally:
+            unregister_local_agent(url)
+
+    left = asyncio.run(main())
+    assert left == {"executor_tasks": 0, "upstream_streams": 0, "skills_in_flight": 0, "items_produced": 0}, (name, left)
+
+
+def test_send_stops_at_deadline() -> None:
+    async def send_one(user_facing_agent: UserFacingAgent, handler, i: int) -> None:
+        await user_facing_agent.get_tldr(f"send #{i}")
+    run_round("send", send_one)
+
+
+def test_stream_cancelled() -> None:
+    async def stream_one(user_facing_agent: UserFacingAgent, handler, i: int) -> None:
+        async for _line in user_facing_agent.stream_tldr(f"stream #{i}"):
+            pass
+    run_round("stream", stream_one)
+
+
+def test_expired_requests_dropped() -> None:
+    async def expired_one(user_facing_agent: UserFacingAgent, handler, i: int) -> None:
+        params = user_facing_agent.message_params(f"expired #{i}", deadline=time.time() - 1)
+        await InProcessA2AClient(handler).send_message(SendMessageRequest(id=str(i), params=params))
+    run_round("expired", expired_one)
+
+
+if __name__ == "__main__":
+    test_send_stops_at_deadline()
+    test_stream_cancelled()
+    test_expired_requests_dropped()
+    print("ok")
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from collections.abc import AsyncGenerator
+from typing import Any, Optional
+
+from a2a.server.request_handlers import RequestHandler
+from a2a.types import (
+    CancelTaskRequest,
+    CancelTaskResponse,
+    CancelTaskSuccessResponse,
+    JSONRPCErrorResponse,
+    SendMessageRequest,
+    SendMessageResponse,
+    SendMessageSuccessResponse,
+    SendStreamingMessageRequest,
+    SendStreamingMessageResponse,
+    SendStreamingMessageSuccessResponse,
+)
+from a2a.utils.errors import ServerError
+
+logger = logging.getLogger(__name__)
+
+# base URL -> request handler of an agent hosted in this process
+_local_agents: dict[str, RequestHandler] = {}
+
+
+def register_local_agent(base_url: str, request_handler: RequestHandler) -> None:
+    """Mark `base_url` as served by `request_handler` inside this process."""
+    _local_agents[base_url.rstrip('/')] = request_handler
+    logger.info(f"Registered in-process agent at {base_url}")
+
+
+def unregister_local_agent(base_url: str) -> None:
+    _local_agents.pop(base_url.rstrip('/'), None)
+
+
+def get_local_handler(base_url: str) -> Optional[RequestHandler]:
+    return _local_agents.get(base_url.rstrip('/'))
+
+
+class InProcessA2AClient:
+    """Drop-in for A2AClient that calls a co-located agent's request handler.
+
+    Requests never touch the network or JSON-RPC serialization: the
+    MessageSendParams object is handed straight to the handler and the
+    resulting Task/Message objects come back as-is.
+
+    As with an HTTP server, the handler keeps running when the caller gives
+    up: it runs in its own task and its events are drained even after the
+    caller has left. (Cancelling the handler mid-request would leave its
+    event queue undrained and the agent's producer task stuck forever.) The
+    request deadline and `cancel_task` are what stop the downstream work.
+    """
+
+    def __init__(self, request_handler: RequestHandler):
+        self.request_handler = request_handler
+        # Handler runs that outlived their caller, kept alive until they finish
+        self._detached: set[asyncio.Task] = set()
+
+    def _track(self, task: asyncio.Task) -> asyncio.Task:
+        self._detached.add(task)
+        task.add_done_callback(self._detached.discard)
+        return task
+
+    async def send_message(
+        self,
+        request: SendMessageRequest,
+        *,
+        http_kwargs: Optional[dict[str, Any]] = None,
+    ) -> SendMessageResponse:
+        handler_run = self._track(asyncio.ensure_future(self.request_handler.on_message_send(request.params)))
+        try:
+            result = await asyncio.shield(handler_run)
+        except ServerError as e:
+            return SendMessageResponse(root=JSONRPCErrorResponse(id=request.id, error=e.error))
+        return SendMessageResponse(root=SendMessageSuccessResponse(id=request.id, result=result))
+
+    async def send_message_streaming(
+        self,
+        request: SendStreamingMessageRequest,
+        *,
+        http_kwargs: Optional[dict[str, Any]] = None,
+    ) -> AsyncGenerator[SendStreamingMessageResponse, None]:
+        events: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def drain() -> None:
+            try:
+                async for event in self.request_handler.on_message_send_stream(request.params):
+                    await events.put(SendStreamingMessageResponse(
+                        root=SendStreamingMessageSuccessResponse(id=request.id, result=event)
+                    ))
+            except ServerError as e:
+                await events.put(SendStreamingMessageResponse(root=JSONRPCErrorResponse(id=request.id, error=e.error)))
+            except Exception as e:
+                await events.put(e)
+            finally:
+                await events.put(done)
+
+        self._track(asyncio.ensure_future(drain()))
+        while (item := await events.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def cancel_task(
+        self,
+        request: CancelTaskRequest,
+        *,
+        http_kwargs: Optional[dict[str, Any]] = None,
+    ) -> CancelTaskResponse:
+        try:
+            result = await self.request_handler.on_cancel_task(request.params)
+        except ServerError as e:
+            return CancelTaskResponse(root=JSONRPCErrorResponse(id=request.id, error=e.error))
+        return CancelTaskResponse(root=CancelTaskSuccessResponse(id=request.id, result=result))
@@ -1,48 +1,114 @@
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
-from pydantic import BaseModel
+
+from book_store import BookStore
+from history import HistoryManager
+from search_index import SearchIndex
 
 # Load environment
 load_dotenv()
 
-# --- Pydantic Models ---
-class Book(BaseModel):
-    title: str
-    pages: dict[int, str] or dict
-    book_desc: str
+# Pages live in SQLite; book_data.json is only an export for index.html
+BOOK_DB_PATH = os.getenv("BOOK_DB_PATH", "book_data.db")
+BOOK_JSON_PATH = os.getenv("BOOK_JSON_PATH", "book_data.json")
+# Books stay server-side; tool calls refer to them by book_id and page number
+store = BookStore(db_path=BOOK_DB_PATH, export_path=BOOK_JSON_PATH, cache_pages=2000)
+search_index = SearchIndex(store)  # Kept current on every update_page
+MAX_PAGES_PER_CALL = 5
+MAX_SEARCH_RESULTS = 10
+PREVIEW_CHARS = 80
+# Token budget for the history sent with each request; older turns are compacted and summarized
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", 8000))
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", 3))
+# Model calls allowed per user message, and tool calls run at the same time
+MAX_AGENT_STEPS = int(os.getenv("MAX_AGENT_STEPS", 8))
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", 8))
 
 # --- Book Functions (Tools) ---
-def get_book_instance(title: str, book_desc: str) -> Book:
-    """Get a new Book instance"""
-    return Book(title=title, book_desc=book_desc, pages={})
+def get_book_instance(title: str, book_desc: str) -> dict:
+    """Create a new book (or reopen the one with this title) and return its handle."""
+    book_id = store.create_book(title, book_desc)
+    return store.get_meta(book_id)
+
+def list_books() -> dict:
+    """List the saved books."""
+    return {"books": store.list_books()}
 
-def get_book() -> dict:
-    """Retrieve the current book from file."""
-    if not os.path.exists("book_data.json"):
+def get_book(book_id: str = None) -> dict:
+    """Title, description and page count of a book (default: the most recently edited one)."""
+    book_id = book_id or store.latest_book_id()
+    meta = store.get_meta(book_id) if book_id else None
+    if meta is None:
         return {"error": "No book found."}
-    with open("book_data.json", "r") as f:
-        return json.load(f)
-
-def update_page(book: Book, page_number: int, page_content: str) -> Book:
-    """Update a specific page in the book."""
-    book.pages[page_number] = page_content
-    save_book(book)
-    return book
-
-def save_book(book: Book) -> str:
-    """Save the updated book to file."""
-    with open("book_data.json", "w") as f:
-        json.dump(book.model_dump(), f, indent=2)
+    return meta
+
+def list_pages(book_id: str) -> dict:
+    """Page numbers of a book, each with its length and a short preview."""
+    if store.get_meta(book_id) is None:
+        return {"error": f"No book with id {book_id}."}
+    pages = store.lazy_pages(book_id)
+    return {
+        "book_id": book_id,
+        "pages": [
+            {"page_number": n, "chars": len(pages[n]), "preview": pages[n][:PREVIEW_CHARS]}
+            for n in pages
+        ],
+    }
+
+def get_page(book_id: str, page_number: int, end_page: int = None) -> dict:
+    """Content of one page, or of pages page_number..end_page (at most MAX_PAGES_PER_CALL)."""
+    first = int(page_number)
+    last = min(int(end_page or first), first + MAX_PAGES_PER_CALL - 1)
+    pages = {str(n): store.get_page(book_id, n) for n in range(first, last + 1)}
+    pages = {n: content for n, content in pages.items() if content is not None}
+    if not pages:
+        return {"error": f"No pages {first}-{last} in book {book_id}."}
+    return {"book_id": book_id, "pages": pages}
+
+def search_book(book_id: str, query: str, limit: int = 5) -> dict:
+    """Pages that best match `query` (BM25), as snippets, so the model reads only those pages."""
+    if store.get_meta(book_id) is None:
+        return {"error": f"No book with id {book_id}."}
+    limit = max(1, min(int(limit), MAX_SEARCH_RESULTS))
+    return {"book_id": book_id, "query": query, "results": search_index.search(book_id, query, limit)}
+
+def update_page(book_id: str, page_number: int, page_content: str) -> dict:
+    """Write one page of a book; only that page is sent and stored."""
+    try:
+        revision = store.update_page(book_id, int(page_number), page_content)
+    except KeyError:
+        return {"error": f"No book with id {book_id}."}
+    return {"book_id": book_id, "page_number": int(page_number), "revision": revision, "status": "saved"}
+
+def save_book(book_id: str) -> str:
+    """Export the book to book_data.json (pages are already saved on every update)."""
+    try:
+        store.export_json(book_id)
+    except KeyError:
+        return f"No book with id {book_id}."
     return "Book saved successfully."
 
+TOOLS = {
+    "get_book_instance": get_book_instance,
+    "list_books": list_books,
+    "get_book": get_book,
+    "list_pages": list_pages,
+    "get_page": get_page,
+    "search_book": search_book,
+    "update_page": update_page,
+    "save_book": save_book,
+}
+
 # --- Function Declarations for Tools ---
+book_id_property = {"type": "string", "description": "Id returned by get_book_instance, get_book or list_books."}
 function_declarations = [
     types.FunctionDeclaration(
         name="get_book_instance",
-        description="Create a new book instance.",
+        description="Create a new book and return its book_id.",
         parameters={
             "type": "object",
             "properties": {
@@ -53,32 +119,73 @@ function_declarations = [
         }
     ),
     types.FunctionDeclaration(
-        name="get_book",
-        description="Fetch the existing saved book.",
+        name="list_books",
+        description="List saved books with their book_id.",
         parameters={"type": "object", "properties": {}}
     ),
+    types.FunctionDeclaration(
+        name="get_book",
+        description="Get a book's title, description and page count (no page contents). Defaults to the most recently edited book.",
+        parameters={
+            "type": "object",
+            "properties": {"book_id": book_id_property}
+        }
+    ),
+    types.FunctionDeclaration(
+        name="list_pages",
+        description="List a book's page numbers with their length and a short preview.",
+        parameters={
+            "type": "object",
+            "properties": {"book_id": book_id_property},
+            "required": ["book_id"]
+        }
+    ),
+    types.FunctionDeclaration(
+        name="get_page",
+        description=f"Read one page, or a range of up to {MAX_PAGES_PER_CALL} pages ending at end_page.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "book_id": book_id_property,
+                "page_number": {"type": "integer"},
+                "end_page": {"type": "integer"}
+            },
+            "required": ["book_id", "page_number"]
+        }
+    ),
+    types.FunctionDeclaration(
+        name="search_book",
+        description="Full-text search of a book's pages. Returns the best matching page numbers with a short snippet each; use get_page to read a match in full.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "book_id": book_id_property,
+                "query": {"type": "string", "description": "Words to look for, e.g. names, places or events."},
+                "limit": {"type": "integer", "description": f"Number of results (at most {MAX_SEARCH_RESULTS}, default 5)."}
+            },
+            "required": ["book_id", "query"]
+        }
+    ),
     types.FunctionDeclaration(
         name="update_page",
-        description="Update a specific page in the book.",
+        description="Write the full content of one page of a book.",
         parameters={
             "type": "object",
             "properties": {
-                "book": {"type": "object"},
+                "book_id": book_id_property,
                 "page_number": {"type": "integer"},
                 "page_content": {"type": "string"}
             },
-            "required": ["book", "page_number", "page_content"]
+            "required": ["book_id", "page_number", "page_content"]
         }
     ),
     types.FunctionDeclaration(
         name="save_book",
-        description="Save the book to file storage.",
+        description="Export the book to book_data.json for the viewer.",
         parameters={
             "type": "object",
-            "properties": {
-                "book": {"type": "object"}
-            },
-            "required": ["book"]
+            "properties": {"book_id": book_id_property},
+            "required": ["book_id"]
         }
     )
 ]
@@ -88,6 +195,66 @@ function_declarations = [
 
 
 
+def summarize_history(previous_summary: str, transcript: str) -> str:
+    """Fold old turns into the running summary with a small, cheap model call."""
+    response = client.models.generate_content(
+        model="gemini-2.5-flash-lite",
+        contents=(
+            "Update this summary of a conversation between a writer and their book-writing "
+            "assistant with the new turns below. Keep book ids, page numbers, decisions and "
+            "open requests; drop page text (it is stored and can be re-read). "
+            "Answer with the summary only, at most 200 words.\n\n"
+            f"Summary so far:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}"
+        ),
+    )
+    return response.text.strip()
+
+
+def run_tool(call: types.FunctionCall) -> types.Part:
+    """Run one requested tool and wrap its result as a function_response part."""
+    args = dict(call.args or {})
+    print(f"🔧 Gemini requested tool: {call.name} with args: {args}")
+    if call.name in TOOLS:
+        try:
+            result = TOOLS[call.name](**args)
+        except Exception as e:
+            result = {"error": f"{call.name} failed: {e}"}
+    else:
+        result = {"error": f"Unknown tool {call.name}."}
+    print("🧩 Tool Result:", result)
+    return types.Part(function_response=types.FunctionResponse(
+        id=call.id,
+        name=call.name,
+        response=result if isinstance(result, dict) else {"result": result},
+    ))
+
+
+def stream_step(config: types.GenerateContentConfig) -> list[types.Part]:
+    """One model call: print text as it streams and return the model's parts."""
+    text, parts, usage = "", [], None
+    for chunk in client.models.generate_content_stream(
+        model="gemini-2.5-flash",
+        contents=history.contents(),
+        config=config,
+    ):
+        usage = chunk.usage_metadata or usage
+        if not chunk.candidates or not chunk.candidates[0].content:
+            continue
+        for part in chunk.candidates[0].content.parts or []:
+            if part.function_call:
+                parts.append(part)  # Keep the part itself (it may carry a thought signature)
+            elif part.text and not part.thought:
+                if not text:
+                    print("🤖 ", end="")
+                print(part.text, end="", flush=True)
+                text += part.text
+    if text:
+        print("")
+        parts.insert(0, types.Part(text=text))
+    history.record_usage(usage)
+    return parts
+
+
 def run_agent():
 
     while True:
@@ -98,61 +265,52 @@ def run_agent():
         
         print("")
         user_prompt = user_input
-        history.append({"role": "user", "parts": [{"text": user_prompt}]})
-    # --- Generate Content ---
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=history,
-            config=types.GenerateContentConfig(
-                system_instruction=system_instruction,
-                tools=tools
-            ),
-        )
-
-        # --- Handle Tool Calls ---
-        if hasattr(response, "candidates") and response.candidates:
-            tool_calls = response.candidates[0].content.parts
-            for part in tool_calls:
-                if part.function_call:
-                    fn_name = part.function_call.name
-                    args = part.function_call.args
-                    print("🌐: ", fn_name, " 🖥️: ", args)
-                    print(f"🔧 Gemini requested tool: {fn_name} with args: {args}")
-
-                    if fn_name == "get_book_instance":
-                        result = get_book_instance(**args)
-                    elif fn_name == "get_book":
-                        result = get_book()
-                    elif fn_name == "update_page":
-                        b = Book(**args["book"])
-                        result = update_page(b, args["page_number"], args["page_content"])
-                    elif fn_name == "save_book":
-                        b = Book(**args["book"])
-                        result = save_book(b)
-
-                    print("🧩 Tool Result:", result)
-                    history.append({
-                            "role": "model",
-                            "parts": [part]  # model's tool call
-                        })
-                    history.append({
-                        "role": "user",
-                        "parts": [{"function_response": {
-                            "name": fn_name,
-                            "response": result.model_dump() if isinstance(result, BaseModel) else result
-                        }}]
-                    })
-        print("🤖", response.text)
+        history.add_user_text(user_prompt)
+
+        # --- Agent loop: call the model until it stops requesting tools ---
+        for step in range(1, MAX_AGENT_STEPS + 1):
+            config = types.GenerateContentConfig(system_instruction=system_instruction, tools=tools)
+            if step == MAX_AGENT_STEPS:
+                # Last step: no more tools, the model has to answer with what it has
+                config.tool_config = types.ToolConfig(
+                    function_calling_config=types.FunctionCallingConfig(mode="NONE")
+                )
+            parts = stream_step(config)
+            if not parts:
+                break
+            history.add({"role": "model", "parts": parts})
+
+            calls = [part.function_call for part in parts if part.function_call]
+            if not calls:
+                break
+            print("🌐: ", ", ".join(call.name for call in calls))
+            # --- Run every call from this response concurrently, results in call order ---
+            responses = list(tool_pool.map(run_tool, calls))
+            history.add({"role": "user", "parts": responses})
+        else:
+            print(f"⚠️ Stopped after {MAX_AGENT_STEPS} model calls.")
+
+        # One JSON export per turn for index.html, however many pages changed
+        store.export_if_dirty()
         print("")
 
 
 if __name__ == "__main__":
     client = genai.Client()
     tools = [types.Tool(function_declarations=function_declarations)]
-    history = []
+    tool_pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS)
+    history = HistoryManager(
+        budget_tokens=HISTORY_TOKEN_BUDGET,
+        keep_recent_turns=HISTORY_KEEP_TURNS,
+        summarize=summarize_history,
+    )
     system_instruction = (
         "You are an expert AI writing assistant that helps users craft, edit, "
-        "and improve books. You can call tools like get_book, update_page, save_book "
-        "to manage book content. Always follow the Book model structure."
+        "and improve books. Books are stored server-side and referred to by book_id: "
+        "use get_book or list_books to find it, list_pages and get_page to read only "
+        "the pages you need, and update_page to write a single page. To find earlier "
+        "content (a character, a scene, an event), use search_book instead of reading pages. "
+        "When you need several independent tool calls (for example reading or "
+        "rewriting a few pages), request them together in one response."
     )
     run_agent()
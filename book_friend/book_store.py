@@ -0,0 +1,315 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Callable, Iterator, Optional
+
+
+def book_id_for(title: str) -> str:
+    """Stable id for a book, derived from its title."""
+    slug = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
+    return slug or "untitled"
+
+
+class LazyPages(Mapping):
+    """Read-only page_number -> content view that loads each page on access."""
+
+    def __init__(self, store: "BookStore", book_id: str):
+        self.store = store
+        self.book_id = book_id
+
+    def __getitem__(self, page_number: int) -> str:
+        content = self.store.get_page(self.book_id, int(page_number))
+        if content is None:
+            raise KeyError(page_number)
+        return content
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.store.page_numbers(self.book_id))
+
+    def __len__(self) -> int:
+        return self.store.page_count(self.book_id)
+
+
+class BookStore:
+    """Page-level storage for book_friend, backed by SQLite.
+
+    - Every page is its own row, so editing one page writes only that page,
+      in a single transaction (a crash leaves either the old or the new page,
+      never a half-written book).
+    - Pages are read one at a time (`get_page`, `LazyPages`) instead of
+      loading the whole book.
+    - Each book has a revision that goes up with every change, which tells
+      `export_if_dirty` whether the JSON copy used by index.html is stale.
+      The export is written to a temp file and atomically renamed.
+
+    The first time a store is opened, an existing `book_data.json` is
+    imported so current books carry over.
+
+    With `cache_pages` > 0, up to that many recently used pages are kept in
+    memory (write-through), so repeated tool calls on the same pages skip
+    SQLite. Only enable it in the process that does all the writes.
+
+    A store can be shared by threads (book_friend runs tool calls in parallel):
+    every statement on the shared connection, and every cache update, runs
+    under one lock, so a reader never sees another thread's open transaction
+    and the cache never holds a page older than the committed one.
+    """
+
+    ITER_BATCH = 64  # Rows fetched per lock acquisition in iter_pages
+
+    def __init__(self, db_path: str = "book_data.db", export_path: str = "book_data.json", cache_pages: int = 0):
+        self.db_path = db_path
+        self.export_path = export_path
+        self.cache_pages = cache_pages
+        self._cache: OrderedDict[tuple[str, int], str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[str, dict[int, str]], None]] = []
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS books (
+                id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                book_desc TEXT NOT NULL,
+                revision INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                book_id TEXT NOT NULL REFERENCES books (id),
+                page_number INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                revision INTEGER NOT NULL,
+                PRIMARY KEY (book_id, page_number)
+            );
+            CREATE TABLE IF NOT EXISTS exports (
+                path TEXT PRIMARY KEY,
+                book_id TEXT NOT NULL,
+                revision INTEGER NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+        if not self.list_books() and os.path.exists(export_path):
+            self.import_json(export_path)
+
+    # --- Books ---
+
+    def create_book(self, title: str, book_desc: str, book_id: Optional[str] = None) -> str:
+        """Create a book (or update the title/description of an existing one)."""
+        book_id = book_id or book_id_for(title)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO books (id, title, book_desc, revision, updated_at) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    title = excluded.title,
+                    book_desc = excluded.book_desc,
+                    revision = books.revision + 1,
+                    updated_at = excluded.updated_at
+                WHERE books.title != excluded.title OR books.book_desc != excluded.book_desc
+                """,
+                (book_id, title, book_desc, time.time()),
+            )
+        return book_id
+
+    def _fetchall(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _fetchone(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def list_books(self) -> list[dict]:
+        rows = self._fetchall("SELECT id, title, revision FROM books ORDER BY updated_at DESC")
+        return [{"book_id": r[0], "title": r[1], "revision": r[2]} for r in rows]
+
+    def latest_book_id(self) -> Optional[str]:
+        row = self._fetchone("SELECT id FROM books ORDER BY updated_at DESC LIMIT 1")
+        return row[0] if row else None
+
+    def get_meta(self, book_id: str) -> Optional[dict]:
+        row = self._fetchone("SELECT title, book_desc, revision FROM books WHERE id = ?", (book_id,))
+        if row is None:
+            return None
+        return {
+            "book_id": book_id,
+            "title": row[0],
+            "book_desc": row[1],
+            "revision": row[2],
+            "page_count": self.page_count(book_id),
+        }
+
+    def revision(self, book_id: str) -> int:
+        row = self._fetchone("SELECT revision FROM books WHERE id = ?", (book_id,))
+        return row[0] if row else 0
+
+    # --- Pages ---
+
+    def get_page(self, book_id: str, page_number: int) -> Optional[str]:
+        key = (book_id, page_number)
+        # Cache lookup, read and cache fill under one lock, so a concurrent
+        # write cannot commit in between and leave the old content cached
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            row = self._conn.execute(
+                "SELECT content FROM pages WHERE book_id = ? AND page_number = ?", (book_id, page_number)
+            ).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def _remember(self, key: tuple[str, int], content: str) -> None:
+        """Cache a page; the caller holds the lock."""
+        if not self.cache_pages:
+            return
+        self._cache[key] = content
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_pages:
+            self._cache.popitem(last=False)
+
+    def page_revision(self, book_id: str, page_number: int) -> Optional[int]:
+        """Revision at which a page last changed (None if there is no such page)."""
+        row = self._fetchone(
+            "SELECT revision FROM pages WHERE book_id = ? AND page_number = ?", (book_id, page_number)
+        )
+        return row[0] if row else None
+
+    def page_numbers(self, book_id: str) -> list[int]:
+        rows = self._fetchall("SELECT page_number FROM pages WHERE book_id = ? ORDER BY page_number", (book_id,))
+        return [r[0] for r in rows]
+
+    def page_count(self, book_id: str) -> int:
+        return self._fetchone("SELECT COUNT(*) FROM pages WHERE book_id = ?", (book_id,))[0]
+
+    def iter_pages(self, book_id: str, start: int = 1, end: Optional[int] = None) -> Iterator[tuple[int, str]]:
+        """Yield (page_number, content) for pages start..end, reading a small batch at a time.
+
+        The lock is only held while a batch is fetched, never across a yield,
+        so the caller may use the store (or write to it) while iterating.
+        """
+        end = end if end is not None else 2**62
+        while True:
+            rows = self._fetchall(
+                "SELECT page_number, content FROM pages WHERE book_id = ? AND page_number BETWEEN ? AND ? "
+                "ORDER BY page_number LIMIT ?",
+                (book_id, start, end, self.ITER_BATCH),
+            )
+            yield from rows
+            if len(rows) < self.ITER_BATCH:
+                return
+            start = rows[-1][0] + 1
+
+    def pages_since(self, book_id: str, revision: int) -> list[tuple[int, str]]:
+        """Pages changed after `revision` (for incremental consumers such as viewers)."""
+        return self._fetchall(
+            "SELECT page_number, content FROM pages WHERE book_id = ? AND revision > ? ORDER BY page_number",
+            (book_id, revision),
+        )
+
+    def lazy_pages(self, book_id: str) -> LazyPages:
+        return LazyPages(self, book_id)
+
+    def add_listener(self, listener: Callable[[str, dict[int, str]], None]) -> None:
+        """Call `listener(book_id, {page_number: content})` after every committed page write.
+
+        Listeners run under the store's lock, in commit order, so they must not
+        read the store or wait on a lock held by a thread that does.
+        """
+        self._listeners.append(listener)
+
+    def update_page(self, book_id: str, page_number: int, content: str) -> int:
+        """Atomically write one page; returns the book's new revision."""
+        return self.update_pages(book_id, {page_number: content})
+
+    def update_pages(self, book_id: str, pages: dict[int, str]) -> int:
+        """Atomically write several pages in one transaction; returns the new revision."""
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "UPDATE books SET revision = revision + 1, updated_at = ? WHERE id = ? RETURNING revision",
+                    (time.time(), book_id),
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    raise KeyError(f"Unknown book: {book_id}")
+                revision = row[0]
+                self._conn.executemany(
+                    """
+                    INSERT INTO pages (book_id, page_number, content, revision) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (book_id, page_number) DO UPDATE SET
+                        content = excluded.content,
+                        revision = excluded.revision
+                    """,
+                    [(book_id, int(n), content, revision) for n, content in pages.items()],
+                )
+            # Still under the lock, so readers never find the old content cached
+            # after the commit and listeners see writes in commit order
+            for n, content in pages.items():
+                self._remember((book_id, int(n)), content)
+            for listener in self._listeners:
+                listener(book_id, {int(n): content for n, content in pages.items()})
+        return revision
+
+    # --- JSON import / export ---
+
+    def import_json(self, path: str) -> str:
+        with open(path) as f:
+            data = json.load(f)
+        book_id = self.create_book(data["title"], data.get("book_desc", ""))
+        if data.get("pages"):
+            self.update_pages(book_id, {int(n): content for n, content in data["pages"].items()})
+        return book_id
+
+    def export_json(self, book_id: str, path: Optional[str] = None) -> None:
+        """Write the book in the legacy book_data.json format, atomically."""
+        path = path or self.export_path
+        meta = self.get_meta(book_id)
+        if meta is None:
+            raise KeyError(f"Unknown book: {book_id}")
+        revision = meta["revision"]
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            # Same layout as json.dump(book.model_dump(), indent=2), one page at a time
+            f.write(f'{{\n  "title": {json.dumps(meta["title"])},\n  "pages": {{')
+            for i, (page_number, content) in enumerate(self.iter_pages(book_id)):
+                f.write(f'{"," if i else ""}\n    "{page_number}": {json.dumps(content)}')
+            f.write(f'\n  }},\n  "book_desc": {json.dumps(meta["book_desc"])}\n}}')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO exports (path, book_id, revision) VALUES (?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET book_id = excluded.book_id, revision = excluded.revision",
+                (os.path.abspath(path), book_id, revision),
+            )
+
+    def export_if_dirty(self, book_id: Optional[str] = None) -> bool:
+        """Re-export `book_id` (default: most recently edited book) if it changed."""
+        book_id = book_id or self.latest_book_id()
+        if book_id is None:
+            return False
+        row = self._fetchone(
+            "SELECT book_id, revision FROM exports WHERE path = ?", (os.path.abspath(self.export_path),)
+        )
+        if row is not None and row[0] == book_id and row[1] >= self.revision(book_id):
+            return False
+        self.export_json(book_id)
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
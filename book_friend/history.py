@@ -0,0 +1,155 @@
+import json
+from typing import Callable, Optional
+
+from google.genai import types
+
+# Tool payloads larger than this are replaced by a reference once they are old
+COMPACT_PAYLOAD_CHARS = 200
+
+
+def estimate_tokens(content) -> int:
+    """Rough token count (about 4 characters per token) of one history entry."""
+    if isinstance(content, types.Content):
+        content = content.model_dump(mode="json", exclude_none=True)
+    elif isinstance(content, dict) and any(isinstance(p, types.Part) for p in content.get("parts", [])):
+        content = {
+            "role": content.get("role"),
+            "parts": [p.model_dump(mode="json", exclude_none=True) if isinstance(p, types.Part) else p for p in content["parts"]],
+        }
+    return len(json.dumps(content, default=str)) // 4 + 1
+
+
+def _call_ref(name: str, args: dict) -> str:
+    shown = {k: v for k, v in args.items() if not (isinstance(v, str) and len(v) > 40)}
+    return f"{name}({', '.join(f'{k}={v!r}' for k, v in shown.items())})"
+
+
+def compact_content(content) -> dict:
+    """Copy of a history entry with large tool payloads replaced by short references."""
+    if isinstance(content, types.Content):
+        content = content.model_dump(exclude_none=True)
+    parts = []
+    for part in content.get("parts", []):
+        if isinstance(part, types.Part):
+            part = part.model_dump(exclude_none=True)
+        call = part.get("function_call")
+        response = part.get("function_response")
+        if call:
+            args = dict(call.get("args") or {})
+            for key, value in args.items():
+                if isinstance(value, str) and len(value) > COMPACT_PAYLOAD_CHARS:
+                    args[key] = f"<{len(value)} chars omitted>"
+            parts.append({"function_call": {"name": call["name"], "args": args}})
+        elif response and len(json.dumps(response.get("response"), default=str)) > COMPACT_PAYLOAD_CHARS:
+            parts.append({"function_response": {
+                "name": response["name"],
+                "response": {"omitted": "Old result removed to save context; call the tool again if you need it."},
+            }})
+        else:
+            parts.append(part)
+    return {"role": content.get("role"), "parts": parts}
+
+
+class HistoryManager:
+    """Conversation history for run_agent, kept under a token budget.
+
+    History is grouped into turns (a user message plus every model and tool
+    entry it led to). Each request sends:
+
+    - a rolling summary of turns that no longer fit,
+    - older turns with their large tool payloads replaced by references
+      (the pages are still in the book store, so the model can re-read them),
+    - the last `keep_recent_turns` turns in full.
+
+    When that is still over `budget_tokens`, the oldest turns are folded into
+    the summary with `summarize(previous_summary, turns_text)` (falling back to
+    a truncated transcript), so the request size, and with it the per-turn
+    latency, stays flat however long the session runs.
+    """
+
+    def __init__(
+        self,
+        budget_tokens: int = 8000,
+        keep_recent_turns: int = 3,
+        summarize: Optional[Callable[[str, str], str]] = None,
+        count_tokens: Callable = estimate_tokens,
+    ):
+        self.budget_tokens = budget_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self.summarize = summarize
+        self.count_tokens = count_tokens
+        self.turns: list[list] = []
+        self.summary = ""
+
+        # Accounting
+        self.last_request_tokens = 0
+        self.last_prompt_tokens: Optional[int] = None  # As reported by the API
+        self.summarized_turns = 0
+
+    def add_user_text(self, text: str) -> None:
+        """Start a new turn with the user's message."""
+        self.turns.append([{"role": "user", "parts": [{"text": text}]}])
+
+    def add(self, content) -> None:
+        """Append a model or tool entry to the current turn."""
+        if not self.turns:
+            self.turns.append([])
+        self.turns[-1].append(content)
+
+    def record_usage(self, usage_metadata) -> None:
+        if usage_metadata is not None and usage_metadata.prompt_token_count:
+            self.last_prompt_tokens = usage_metadata.prompt_token_count
+
+    def contents(self) -> list:
+        """The history to send with the next request, within the budget."""
+        contents = self._build()
+        self.last_request_tokens = sum(self.count_tokens(c) for c in contents)
+        older_turns = len(self.turns) - self.keep_recent_turns
+        if self.last_request_tokens > self.budget_tokens and older_turns > 0:
+            # One summarize call for everything but the recent turns
+            self._fold_turns(older_turns)
+            contents = self._build()
+            self.last_request_tokens = sum(self.count_tokens(c) for c in contents)
+        return contents
+
+    def _build(self) -> list:
+        contents = []
+        if self.summary:
+            contents.append({"role": "user", "parts": [{"text": f"Summary of the conversation so far:\n{self.summary}"}]})
+            contents.append({"role": "model", "parts": [{"text": "Understood."}]})
+        split = max(0, len(self.turns) - self.keep_recent_turns)
+        for turn in self.turns[:split]:
+            contents.extend(compact_content(c) for c in turn)
+        for turn in self.turns[split:]:
+            contents.extend(turn)
+        return contents
+
+    def _fold_turns(self, count: int) -> None:
+        folded, self.turns = self.turns[:count], self.turns[count:]
+        transcript = "\n".join(self._describe(c) for turn in folded for c in turn)
+        if self.summarize is not None:
+            try:
+                self.summary = self.summarize(self.summary, transcript)
+            except Exception as e:
+                print(f"⚠️ Could not summarize history ({e}); keeping a truncated transcript instead.")
+                self.summary = self._truncate(f"{self.summary}\n{transcript}")
+        else:
+            self.summary = self._truncate(f"{self.summary}\n{transcript}")
+        self.summarized_turns += count
+
+    def _truncate(self, text: str) -> str:
+        # Keep the summary to a quarter of the budget (about 4 characters per token)
+        limit = self.budget_tokens
+        return text.strip()[-limit:]
+
+    @staticmethod
+    def _describe(content) -> str:
+        content = compact_content(content)
+        lines = []
+        for part in content["parts"]:
+            if part.get("text"):
+                lines.append(f"{content['role']}: {part['text']}")
+            elif part.get("function_call"):
+                call = part["function_call"]
+                lines.append(f"model called {_call_ref(call['name'], call.get('args') or {})}")
+        return "\n".join(lines)
@@ -0,0 +1,116 @@
+"""Measure per-turn request size for whole-book tools vs book_id/page tools.
+
+Replays the same editing session (each turn reads a page and rewrites it)
+with two tool styles and reports how many tokens the request sent to the
+model contains on every turn, since run_agent resends the whole history:
+
+    whole-book  get_book returns every page; update_page takes the whole book
+                as an argument and returns it (the previous tools)
+    page        get_page / update_page(book_id, n, content) exchange one page
+    managed     page tools, with history kept under --budget by HistoryManager
+                (old tool payloads compacted, oldest turns summarized)
+
+Tokens are counted with the Gemini count_tokens API when --api is given
+(needs GEMINI_API_KEY / GOOGLE_API_KEY), otherwise estimated as chars / 4.
+
+Usage:
+    python measure_tokens.py --pages 50 --turns 10
+    python measure_tokens.py --pages 50 --turns 10 --api
+    python measure_tokens.py --turns 100 --budget 4000
+"""
+import argparse
+import copy
+import json
+import random
+
+from history import HistoryManager
+
+MODEL = "gemini-2.5-flash"
+
+
+def make_page(n: int, chars: int) -> str:
+    words = ["Ethan", "storm", "city", "light", "wind", "hero", "night", "power", "Nova", "Haven"]
+    text = f"Chapter {n}\n\n"
+    while len(text) < chars:
+        text += " ".join(random.choice(words) for _ in range(12)) + ". "
+    return text[:chars]
+
+
+def tool_turn(history: list, user_text: str, name: str, args: dict, response: dict) -> None:
+    history.append({"role": "user", "parts": [{"text": user_text}]})
+    history.append({"role": "model", "parts": [{"function_call": {"name": name, "args": args}}]})
+    history.append({"role": "user", "parts": [{"function_response": {"name": name, "response": response}}]})
+
+
+def whole_book_turn(history: list, book: dict, page_number: int, content: str) -> None:
+    tool_turn(history, f"Show me page {page_number}", "get_book", {}, copy.deepcopy(book))
+    book["pages"][str(page_number)] = content
+    tool_turn(history, f"Rewrite page {page_number}", "update_page",
+              {"book": copy.deepcopy(book), "page_number": page_number, "page_content": content}, copy.deepcopy(book))
+
+
+def page_turn(history: list, book_id: str, page_number: int, old: str, content: str) -> None:
+    tool_turn(history, f"Show me page {page_number}", "get_page",
+              {"book_id": book_id, "page_number": page_number},
+              {"book_id": book_id, "pages": {str(page_number): old}})
+    tool_turn(history, f"Rewrite page {page_number}", "update_page",
+              {"book_id": book_id, "page_number": page_number, "page_content": content},
+              {"book_id": book_id, "page_number": page_number, "revision": page_number + 1, "status": "saved"})
+
+
+class ManagedHistory:
+    """Feeds the same turns through HistoryManager (no summarizer model, so it truncates)."""
+
+    def __init__(self, budget: int):
+        self.manager = HistoryManager(budget_tokens=budget)
+
+    def append(self, content: dict) -> None:
+        if content["role"] == "user" and "text" in content["parts"][0]:
+            self.manager.add_user_text(content["parts"][0]["text"])
+        else:
+            self.manager.add(content)
+
+    def contents(self) -> list:
+        return self.manager.contents()
+
+
+def make_counter(use_api: bool):
+    if not use_api:
+        return lambda history: len(json.dumps(history)) // 4
+    from dotenv import load_dotenv
+    from google import genai
+    load_dotenv()
+    client = genai.Client()
+    return lambda history: client.models.count_tokens(model=MODEL, contents=history).total_tokens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-turn tokens: whole-book tools vs page tools")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--page-chars", type=int, default=3000)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--budget", type=int, default=8000, help="HistoryManager token budget")
+    parser.add_argument("--api", action="store_true", help="Count with the Gemini API instead of estimating")
+    args = parser.parse_args()
+
+    random.seed(0)
+    count = make_counter(args.api)
+    pages = {str(n): make_page(n, args.page_chars) for n in range(1, args.pages + 1)}
+    book = {"title": "Astra: The Rise of a Hero", "pages": dict(pages), "book_desc": "A young hero's story."}
+    whole_history, page_history = [], []
+    managed = ManagedHistory(args.budget)
+
+    print(f"{'turn':>4} {'whole-book':>12} {'page':>10} {'ratio':>7} {'managed':>9}")
+    for turn in range(1, args.turns + 1):
+        page_number = random.randint(1, args.pages)
+        old, new = pages[str(page_number)], make_page(page_number, args.page_chars)
+        pages[str(page_number)] = new
+        whole_book_turn(whole_history, book, page_number, new)
+        page_turn(page_history, "astra-the-rise-of-a-hero", page_number, old, new)
+        page_turn(managed, "astra-the-rise-of-a-hero", page_number, old, new)
+        whole, paged, kept = count(whole_history), count(page_history), count(managed.contents())
+        print(f"{turn:>4} {whole:>12,} {paged:>10,} {whole / paged:>6.1f}x {kept:>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark search_book on large books.
+
+Builds a synthetic book with --pages pages in a temporary database and
+reports:
+
+    build       time to index the whole book (paid once, on the first search)
+    search      query latency percentiles for SearchIndex.search (BM25 + snippets)
+    scan        the same queries answered by reading every page and counting
+                matches, which is what the model had to do with get_book
+    update      latency of update_page with the index listening (page write
+                plus re-indexing that one page)
+
+It also prints how many characters a search result sends to the model
+compared to the whole book.
+
+Usage:
+    python search_benchmark.py --pages 5000 --queries 200
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from book_store import BookStore
+from search_index import SearchIndex, tokenize
+
+
+def make_vocabulary(size: int) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(random.choice(letters) for _ in range(random.randint(3, 9))) for _ in range(size)]
+
+
+def make_page(vocabulary: list[str], cum_weights: list[float], chars: int) -> str:
+    words = []
+    length = 0
+    while length < chars:
+        sentence = " ".join(random.choices(vocabulary, cum_weights=cum_weights, k=12)).capitalize() + "."
+        words.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(words)[:chars]
+
+
+def percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(len(samples) * q))] * 1000
+    return f"p50 {pick(0.5):.2f} ms, p90 {pick(0.9):.2f} ms, p99 {pick(0.99):.2f} ms"
+
+
+def scan(store: BookStore, book_id: str, query: str, limit: int) -> list[int]:
+    terms = set(tokenize(query))
+    matches = []
+    for page_number, content in store.iter_pages(book_id):
+        hits = sum(1 for token in tokenize(content) if token in terms)
+        if hits:
+            matches.append((hits, page_number))
+    return [n for _, n in sorted(matches, reverse=True)[:limit]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="search_book latency on large books")
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--page-chars", type=int, default=2000)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=10, help="Queries to time with the full scan")
+    args = parser.parse_args()
+
+    random.seed(0)
+    vocabulary = make_vocabulary(args.vocabulary)
+    # Zipf-like word frequencies
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BookStore(os.path.join(tmp, "bench.db"), os.path.join(tmp, "bench.json"))
+        book_id = store.create_book("Benchmark", "Synthetic book")
+        pages = {n: make_page(vocabulary, cum_weights, args.page_chars) for n in range(1, args.pages + 1)}
+        store.update_pages(book_id, pages)
+        book_chars = sum(len(content) for content in pages.values())
+        print(f"{args.pages} pages, {book_chars / 1e6:.1f}M characters")
+
+        index = SearchIndex(store)
+        start = time.perf_counter()
+        index.search(book_id, vocabulary[0])
+        print(f"build:  {time.perf_counter() - start:.2f}s for {len(index.books[book_id].postings):,} terms")
+
+        # Mix of common and rare words, one to three per query
+        queries = [" ".join(random.choices(vocabulary[:2000], k=random.randint(1, 3))) for _ in range(args.queries)]
+        timings, result_chars = [], []
+        for query in queries:
+            start = time.perf_counter()
+            results = index.search(book_id, query)
+            timings.append(time.perf_counter() - start)
+            result_chars.append(len(json.dumps(results)))
+        print(f"search: {percentiles(timings)}")
+
+        scan_timings = []
+        for query in queries[:args.scan_queries]:
+            start = time.perf_counter()
+            scan(store, book_id, query, 5)
+            scan_timings.append(time.perf_counter() - start)
+        print(f"scan:   {percentiles(scan_timings)}")
+
+        update_timings = []
+        for _ in range(100):
+            page_number = random.randint(1, args.pages)
+            content = make_page(vocabulary, cum_weights, args.page_chars)
+            start = time.perf_counter()
+            store.update_page(book_id, page_number, content)
+            update_timings.append(time.perf_counter() - start)
+        print(f"update: {percentiles(update_timings)}")
+
+        print(f"sent to the model: {statistics.mean(result_chars):,.0f} chars per search "
+              f"vs {book_chars:,} for the whole book")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
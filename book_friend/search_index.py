@@ -0,0 +1,149 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Optional
+
+from book_store import BookStore
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+SNIPPET_CHARS = 240
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class BookIndex:
+    """Inverted index (term -> {page_number: term frequency}) for one book."""
+
+    def __init__(self):
+        self.postings: dict[str, dict[int, int]] = {}
+        self.page_terms: dict[int, tuple[str, ...]] = {}
+        self.page_lengths: dict[int, int] = {}
+        self.total_length = 0
+
+    def set_page(self, page_number: int, content: str) -> None:
+        self.remove_page(page_number)
+        tokens = tokenize(content)
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[page_number] = tf
+        self.page_terms[page_number] = tuple(counts)
+        self.page_lengths[page_number] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove_page(self, page_number: int) -> None:
+        for term in self.page_terms.pop(page_number, ()):
+            pages = self.postings[term]
+            del pages[page_number]
+            if not pages:
+                del self.postings[term]
+        self.total_length -= self.page_lengths.pop(page_number, 0)
+
+    def bm25(self, terms: list[str], limit: int, k1: float = 1.2, b: float = 0.75) -> list[tuple[float, int]]:
+        """Top `limit` (score, page_number) pairs for the query terms."""
+        pages = len(self.page_lengths)
+        if not pages:
+            return []
+        average_length = self.total_length / pages or 1
+        scores: dict[int, float] = {}
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (pages - len(postings) + 0.5) / (len(postings) + 0.5))
+            for page_number, tf in postings.items():
+                norm = k1 * (1 - b + b * self.page_lengths[page_number] / average_length)
+                scores[page_number] = scores.get(page_number, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        return heapq.nlargest(limit, ((score, n) for n, score in scores.items()))
+
+
+class SearchIndex:
+    """BM25 full-text search over the pages in a BookStore.
+
+    A book is indexed the first time it is searched (one pass over its pages),
+    then kept current from the store's write listener, so each update_page
+    only re-indexes the page it wrote. A search touches only the postings of
+    the query terms and reads just the matching pages it returns snippets for.
+
+    The store calls the listener while holding its own lock, so this index
+    never reads the store while holding `_lock`: a book is built with `_lock`
+    released, and writes committed meanwhile are collected by the listener and
+    applied before the index is published.
+    """
+
+    def __init__(self, store: BookStore):
+        self.store = store
+        self.books: dict[str, BookIndex] = {}
+        self._building: dict[str, dict[int, str]] = {}  # book_id -> pages written during its build
+        self._lock = threading.Condition()
+        store.add_listener(self.on_pages_updated)
+
+    def on_pages_updated(self, book_id: str, pages: dict[int, str]) -> None:
+        with self._lock:
+            index = self.books.get(book_id)
+            if index is None:
+                if book_id in self._building:
+                    self._building[book_id].update(pages)
+                return  # Not indexed yet; it will be built from the store when first searched
+            for page_number, content in pages.items():
+                index.set_page(page_number, content)
+
+    def _book_index(self, book_id: str) -> BookIndex:
+        """The book's index, building it first if needed; called and returns with `_lock` held."""
+        while book_id in self._building:
+            self._lock.wait()  # Another search is building it
+        index = self.books.get(book_id)
+        if index is not None:
+            return index
+        self._building[book_id] = {}
+        self._lock.release()
+        try:
+            index = BookIndex()
+            for page_number, content in self.store.iter_pages(book_id):
+                index.set_page(page_number, content)
+        finally:
+            self._lock.acquire()
+            written = self._building.pop(book_id)
+            self._lock.notify_all()
+        # Listeners run in commit order, so these are the latest contents of
+        # any page the pass above may have read before it was rewritten
+        for page_number, content in written.items():
+            index.set_page(page_number, content)
+        self.books[book_id] = index
+        return index
+
+    def search(self, book_id: str, query: str, limit: int = 5) -> list[dict]:
+        """Best matching pages for `query`, each with a snippet around the first match."""
+        terms = tokenize(query)
+        with self._lock:
+            hits = self._book_index(book_id).bm25(terms, limit)
+        results = []
+        for score, page_number in hits:
+            content = self.store.get_page(book_id, page_number)
+            if content is None:
+                continue
+            results.append({
+                "page_number": page_number,
+                "score": round(score, 3),
+                "snippet": snippet(content, terms),
+            })
+        return results
+
+
+def snippet(content: str, terms: list[str], size: int = SNIPPET_CHARS) -> str:
+    """About `size` characters of `content` around the first query term it contains."""
+    lowered = content.lower()
+    first: Optional[int] = None
+    for term in terms:
+        match = re.search(rf"\b{re.escape(term)}\b", lowered)
+        if match and (first is None or match.start() < first):
+            first = match.start()
+    if first is None:
+        first = 0
+    start = max(0, first - size // 3)
+    end = min(len(content), start + size)
+    text = " ".join(content[start:end].split())
+    return f"{'…' if start else ''}{text}{'…' if end < len(content) else ''}"
@@ -0,0 +1,127 @@
+"""Concurrent read/write checks for BookStore and SearchIndex.
+
+Writer threads keep rewriting a few pages with increasing versions while
+reader threads read them through the page cache. After every write a page
+must never be read back older than what was committed before the read
+started, and at the end the cache must agree with the database.
+
+A first search (which builds the book's index) runs alongside page updates,
+as when the model asks for search_book and update_page in one response: it
+must not deadlock, and the index must end up matching the stored pages.
+
+Usage:
+    python test_book_store.py          # or: python -m pytest test_book_store.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+from book_store import BookStore
+from search_index import SearchIndex, tokenize
+
+PAGES = 8
+WRITES = 2000
+READERS = 4
+SEARCH_PAGES = 400
+SEARCH_TIMEOUT = 30  # Seconds; far longer than indexing SEARCH_PAGES pages takes
+
+
+def version(content: str) -> int:
+    return int(content.rsplit(" ", 1)[1])
+
+
+def test_concurrent_reads_and_writes() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "test.db")
+        store = BookStore(db_path, os.path.join(tmp, "test.json"), cache_pages=PAGES // 4)  # Small, so reads keep missing
+        book_id = store.create_book("Concurrency", "")
+        store.update_pages(book_id, {n: f"page {n} version 0" for n in range(1, PAGES + 1)})
+        committed = {n: 0 for n in range(1, PAGES + 1)}  # Highest version known to be committed
+        done = threading.Event()
+        errors = []
+
+        def write() -> None:
+            for v in range(1, WRITES + 1):
+                n = v % PAGES + 1
+                store.update_page(book_id, n, f"page {n} version {v}")
+                committed[n] = v
+            done.set()
+
+        def read() -> None:
+            while not done.is_set():
+                for n in range(1, PAGES + 1):
+                    floor = committed[n]
+                    seen = version(store.get_page(book_id, n))
+                    if seen < floor:
+                        errors.append(f"page {n}: read version {seen} after {floor} was committed")
+                store.page_revision(book_id, 1)
+                list(store.iter_pages(book_id))
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # Switch threads often so reads and writes interleave
+        threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(READERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sys.setswitchinterval(switch_interval)
+
+        assert not errors, errors[:5]
+        with sqlite3.connect(db_path) as conn:
+            stored = dict(conn.execute("SELECT page_number, content FROM pages WHERE book_id = ?", (book_id,)))
+        for n in range(1, PAGES + 1):
+            cached = store.get_page(book_id, n)
+            assert cached == stored[n], f"page {n}: cache has {cached!r}, database has {stored[n]!r}"
+        store.close()
+
+
+def test_search_while_updating() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BookStore(os.path.join(tmp, "test.db"), os.path.join(tmp, "test.json"))
+        book_id = store.create_book("Search", "")
+        store.update_pages(book_id, {n: f"page {n} original text" for n in range(1, SEARCH_PAGES + 1)})
+        errors = []
+
+        def search() -> None:
+            try:
+                store_index.search(book_id, "original")
+            except Exception as e:
+                errors.append(repr(e))
+
+        def update(trial: int) -> None:
+            try:
+                for n in range(trial + 1, SEARCH_PAGES + 1, 7):
+                    store.update_page(book_id, n, f"page {n} edit {trial}")
+            except Exception as e:
+                errors.append(repr(e))
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        for trial in range(5):
+            store_index = SearchIndex(store)  # Fresh, so every trial builds the index
+            threads = [
+                threading.Thread(target=search, daemon=True),
+                threading.Thread(target=update, args=(trial,), daemon=True),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(SEARCH_TIMEOUT)
+            if any(thread.is_alive() for thread in threads):
+                sys.setswitchinterval(switch_interval)
+                raise AssertionError("search and update_page deadlocked")
+            assert not errors, errors
+
+            index = store_index.books[book_id]
+            for n, content in store.iter_pages(book_id):
+                assert index.page_terms[n] == tuple(dict.fromkeys(tokenize(content))), f"page {n} is stale in the index"
+        sys.setswitchinterval(switch_interval)
+        store.close()
+
+
+if __name__ == "__main__":
+    test_concurrent_reads_and_writes()
+    test_search_while_updating()
+    print("ok")
@@ -0,0 +1,237 @@
+"""Live book viewer: serves index.html plus a small page-level JSON API.
+
+    GET /                                   the viewer
+    GET /api/books                          saved books
+    GET /api/books/{book_id}                title, description, revision, page numbers
+    GET /api/books/{book_id}/pages?start=&limit=
+                                            up to `limit` pages from page `start` on,
+                                            with `next` for the following batch
+    GET /api/books/{book_id}/pages/{n}      one page
+    GET /api/books/{book_id}/events         Server-Sent Events: a `page` event for
+                                            every page that changes, a `meta` event
+                                            when the book's revision moves
+
+JSON responses carry an ETag built from the book (or page) revision, so a
+browser revalidating with If-None-Match gets a 304 without the page text
+being read or sent. The event stream uses the book revision as the event id;
+on reconnect (Last-Event-ID, or ?since=) only pages changed after it are sent.
+
+Pages are read from the same SQLite database agent.py writes to. One watcher
+per open book polls the book's revision (a single-row lookup) and fans the
+changed pages out to every connected viewer, so nothing is pushed, and no
+page is read, while the book is not being edited.
+
+Usage (run next to agent.py):
+    python viewer_server.py --port 8000
+"""
+import argparse
+import asyncio
+import json
+import os
+from itertools import islice
+from typing import AsyncIterator, Callable, Optional
+
+import uvicorn
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from book_store import BookStore
+
+load_dotenv()
+
+BOOK_DB_PATH = os.getenv("BOOK_DB_PATH", "book_data.db")
+BOOK_JSON_PATH = os.getenv("BOOK_JSON_PATH", "book_data.json")
+VIEWER_POLL_SECONDS = float(os.getenv("VIEWER_POLL_SECONDS", 0.5))
+KEEPALIVE_SECONDS = 15
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+INDEX_HTML = os.path.join(os.path.dirname(os.path.abspath(__file__)), "index.html")
+
+# No page cache: agent.py writes the pages from another process
+store = BookStore(db_path=BOOK_DB_PATH, export_path=BOOK_JSON_PATH)
+
+
+class BookWatcher:
+    """Polls one book's revision and pushes changed pages to subscriber queues."""
+
+    def __init__(self, book_id: str, interval: float = VIEWER_POLL_SECONDS):
+        self.book_id = book_id
+        self.interval = interval
+        self.subscribers: set[asyncio.Queue] = set()
+        self.revision = store.revision(book_id)
+        self.task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.subscribers:
+                watchers.pop(self.book_id, None)
+                return
+            revision = store.revision(self.book_id)
+            if revision == self.revision:
+                continue
+            update = (revision, store.get_meta(self.book_id), store.pages_since(self.book_id, self.revision))
+            self.revision = revision
+            for queue in self.subscribers:
+                queue.put_nowait(update)
+
+
+watchers: dict[str, BookWatcher] = {}
+
+
+def subscribe(book_id: str) -> asyncio.Queue:
+    watcher = watchers.get(book_id)
+    if watcher is None:
+        watcher = watchers[book_id] = BookWatcher(book_id)
+    queue = asyncio.Queue()
+    watcher.subscribers.add(queue)
+    return queue
+
+
+def unsubscribe(book_id: str, queue: asyncio.Queue) -> None:
+    watcher = watchers.get(book_id)
+    if watcher is not None:
+        watcher.subscribers.discard(queue)
+
+
+def cached_json(request: Request, etag: str, build: Callable[[], dict]) -> Response:
+    """JSON response with an ETag; 304 (without building the payload) if the client has it."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build(), headers=headers)
+
+
+def not_found(message: str) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=404)
+
+
+def page_limit(request: Request) -> int:
+    try:
+        limit = int(request.query_params.get("limit", DEFAULT_PAGE_LIMIT))
+    except ValueError:
+        limit = DEFAULT_PAGE_LIMIT
+    return max(1, min(limit, MAX_PAGE_LIMIT))
+
+
+async def index(request: Request) -> FileResponse:
+    return FileResponse(INDEX_HTML)
+
+
+async def list_books(request: Request) -> JSONResponse:
+    return JSONResponse({"books": store.list_books()}, headers={"Cache-Control": "no-cache"})
+
+
+async def get_book(request: Request) -> Response:
+    book_id = request.path_params["book_id"]
+    revision = store.revision(book_id)
+    if not revision:
+        return not_found(f"No book with id {book_id}.")
+
+    def build() -> dict:
+        return {**store.get_meta(book_id), "page_numbers": store.page_numbers(book_id)}
+    return cached_json(request, f'"{book_id}-{revision}"', build)
+
+
+async def get_pages(request: Request) -> Response:
+    book_id = request.path_params["book_id"]
+    revision = store.revision(book_id)
+    if not revision:
+        return not_found(f"No book with id {book_id}.")
+    try:
+        start = int(request.query_params.get("start", 1))
+    except ValueError:
+        return JSONResponse({"error": "start must be a page number."}, status_code=400)
+    limit = page_limit(request)
+
+    def build() -> dict:
+        # One row past the batch tells whether there is a next batch
+        rows = list(islice(store.iter_pages(book_id, start), limit + 1))
+        return {
+            "book_id": book_id,
+            "revision": revision,
+            "pages": {str(n): content for n, content in rows[:limit]},
+            "next": rows[limit][0] if len(rows) > limit else None,
+        }
+    return cached_json(request, f'"{book_id}-{revision}-{start}-{limit}"', build)
+
+
+async def get_page(request: Request) -> Response:
+    book_id = request.path_params["book_id"]
+    page_number = request.path_params["page_number"]
+    revision = store.page_revision(book_id, page_number)
+    if revision is None:
+        return not_found(f"No page {page_number} in book {book_id}.")
+
+    def build() -> dict:
+        return {"book_id": book_id, "page_number": page_number, "revision": revision,
+                "content": store.get_page(book_id, page_number)}
+    return cached_json(request, f'"{book_id}-{page_number}-{revision}"', build)
+
+
+def sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def update_events(revision: int, meta: Optional[dict], pages: list) -> list[str]:
+    events = [sse("page", {"page_number": n, "content": content, "revision": revision}) for n, content in pages]
+    if meta is not None:
+        events.append(sse("meta", meta, event_id=revision))
+    return events
+
+
+async def book_events(request: Request) -> Response:
+    book_id = request.path_params["book_id"]
+    if not store.revision(book_id):
+        return not_found(f"No book with id {book_id}.")
+    try:
+        since = int(request.headers.get("last-event-id") or request.query_params.get("since") or 0)
+    except ValueError:
+        since = 0
+
+    async def stream() -> AsyncIterator[str]:
+        # Subscribe before catching up, so no change can fall between the two
+        queue = subscribe(book_id)
+        try:
+            sent = store.revision(book_id)
+            yield "retry: 2000\n\n"
+            if since and since < sent:
+                for event in update_events(sent, store.get_meta(book_id), store.pages_since(book_id, since)):
+                    yield event
+            while True:
+                try:
+                    revision, meta, pages = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if revision <= sent:
+                    continue  # Already covered by the catch-up above
+                sent = revision
+                for event in update_events(revision, meta, pages):
+                    yield event
+        finally:
+            unsubscribe(book_id, queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+app = Starlette(routes=[
+    Route("/", index),
+    Route("/api/books", list_books),
+    Route("/api/books/{book_id}", get_book),
+    Route("/api/books/{book_id}/pages", get_pages),
+    Route("/api/books/{book_id}/pages/{page_number:int}", get_page),
+    Route("/api/books/{book_id}/events", book_events),
+])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the live book viewer")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,171 @@
+"""Run the text pipeline over a corpus.
+
+Inputs are streamed from a directory (every .txt / .md file, id = relative
+path) or a JSONL file (one {"id": ..., "text": ...} object per line), so
+the corpus is never loaded at once. Up to --concurrency documents are in
+flight, new documents start at most --rate times per second, and every
+result is appended to the output JSONL as soon as it is ready.
+
+With --cache PATH, node results are cached by content (see node_cache.py), so
+re-running over a mostly unchanged corpus only calls the LLM for new or
+edited documents.
+
+Completed ids are appended to a checkpoint file (default: <output>.checkpoint)
+right after their result, so a crashed or interrupted run started again with
+the same arguments skips them. A crash between the two writes can repeat one
+document's line in the output; keep the last line per id.
+
+Usage:
+    python batch.py corpus/ --output results.jsonl --concurrency 16 --rate 5
+    python batch.py docs.jsonl --output results.jsonl --mode structured --cache node_cache.db
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+from text_pipeline import PIPELINE_CACHE_PATH, PIPELINE_MODE, PIPELINE_MODES, build_graph, open_node_cache
+
+TEXT_SUFFIXES = (".txt", ".md")
+
+
+def iter_directory(path: str) -> Iterator[tuple[str, str]]:
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(TEXT_SUFFIXES):
+                file_path = os.path.join(root, name)
+                with open(file_path, encoding="utf-8") as f:
+                    yield os.path.relpath(file_path, path), f.read()
+
+
+def iter_jsonl(path: str, id_field: str, text_field: str) -> Iterator[tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield str(record.get(id_field, line_number)), record[text_field]
+
+
+def load_checkpoint(path: str) -> set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        # A partial last line (crash mid-write) is not a completed id
+        return {line[:-1] for line in f if line.endswith("\n")}
+
+
+class RateLimiter:
+    """Lets at most `rate` callers through per second, evenly spaced."""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1 / rate if rate else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def run_batch(
+    app,
+    documents: Iterator[tuple[str, str]],
+    output_path: str,
+    checkpoint_path: str,
+    concurrency: int,
+    rate: Optional[float],
+) -> None:
+    done = load_checkpoint(checkpoint_path)
+    limiter = RateLimiter(rate)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)  # Bounded: read ahead only a little
+    stats = {"processed": 0, "failed": 0, "skipped": 0}
+    start = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as output, open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+
+        async def produce() -> None:
+            for doc_id, text in documents:
+                if doc_id in done:
+                    stats["skipped"] += 1
+                    continue
+                await queue.put((doc_id, text))
+            for _ in range(concurrency):
+                await queue.put(None)
+
+        async def work() -> None:
+            while (item := await queue.get()) is not None:
+                doc_id, text = item
+                await limiter.wait()
+                try:
+                    result = await app.ainvoke({"text": text})
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"⚠️ {doc_id}: {type(e).__name__}: {e}", file=sys.stderr)
+                    continue
+                record = {"id": doc_id, **{k: v for k, v in result.items() if k not in ("text", "chunks")}}
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                checkpoint.write(f"{doc_id}\n")
+                checkpoint.flush()
+                stats["processed"] += 1
+                if stats["processed"] % 50 == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"{stats['processed']} docs, {stats['processed'] / elapsed:.2f} docs/s")
+
+        await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Processed {stats['processed']} docs in {elapsed:.1f}s ({stats['processed'] / elapsed:.2f} docs/s), "
+        f"{stats['failed']} failed, {stats['skipped']} already done"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Classify, extract entities from and summarize a corpus")
+    parser.add_argument("input", help="Directory of .txt/.md files or a JSONL file")
+    parser.add_argument("--output", default="results.jsonl")
+    parser.add_argument("--checkpoint", help="Completed ids (default: <output>.checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Documents in flight")
+    parser.add_argument("--rate", type=float, help="Documents started per second (default: unlimited)")
+    parser.add_argument("--mode", choices=list(PIPELINE_MODES), default=PIPELINE_MODE,
+                        help="multi: one LLM call per task; structured: one call for all three")
+    parser.add_argument("--cache", default=PIPELINE_CACHE_PATH or None, metavar="PATH",
+                        help="SQLite node result cache to read and fill (default: $PIPELINE_CACHE_PATH, else off)")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--text-field", default="text")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.input):
+        documents = iter_directory(args.input)
+    else:
+        documents = iter_jsonl(args.input, args.id_field, args.text_field)
+
+    cache = open_node_cache(args.cache) if args.cache else None
+    app = build_graph(args.mode, cache=cache)
+
+    async def run() -> None:
+        # The nodes are synchronous, so each document's branches run on the default executor
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=args.concurrency * 3))
+        await run_batch(app, documents, args.output, args.checkpoint or f"{args.output}.checkpoint", args.concurrency, args.rate)
+
+    asyncio.run(run())
+    if cache is not None:
+        print(f"Node cache: {cache.stats()}")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
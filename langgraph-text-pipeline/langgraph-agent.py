@@ -1,93 +1,15 @@
-import getpass
+import io
 import os
-from dotenv import load_dotenv
-from typing import TypedDict, List, Annotated
-from langgraph.graph import StateGraph, END
-from langchain.prompts import PromptTemplate
-from langchain.schema import HumanMessage
+import time
 from langchain_core.runnables.graph import MermaidDrawMethod
 from IPython.display import display, Image
-from langchain_google_genai import ChatGoogleGenerativeAI
 import matplotlib.pyplot as plt
-import io
 from PIL import Image as PILImage
 
-load_dotenv()
-
-os.environ["GOOGLE_API_KEY"] = os.getenv('GOOGLE_API_KEY')
-if "GOOGLE_API_KEY" not in os.environ:
-    os.environ["GOOGLE_API_KEY"] = getpass.getpass("Enter your Google AI API key: ")
-
-
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash-lite",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-)
-
-# response = llm.invoke("Hello! Are you working?")
-# print(response.content)
-
-class State(TypedDict):
-    text: str
-    classification: str
-    entities: List[str]
-    summary: str
-
-
-def classification_node(state: State):
-    '''Classify the text into one of the categories: News, Blog, Research, or Other'''
-    prompt = PromptTemplate(
-        input_variables=["text"],
-        template="Classify the following text into one of the categories: News, Blog, Research, or Other.\n\nText:{text}\n\nCategory:"
-    )
-    message = HumanMessage(content=prompt.format(text=state["text"]))
-    classification = llm.invoke([message]).content.strip()
-    return {"classification": classification}
-
-
-def entity_extraction_node(state: State):
-    '''Extract all the entities (Person, Organization, Location) from the text'''
-    prompt = PromptTemplate(
-        input_variables=["text"],
-        template="Extract all the entities (Person, Organization, Location) from the following text. Provide the result as a comma-separated list.\n\nText:{text}\n\nEntities:"
-    )
-    message = HumanMessage(content=prompt.format(text=state["text"]))
-    entities = llm.invoke([message]).content.strip().split(", ")
-    return {"entities": entities}
-
-def summarization_node(state: State):
-    '''Summarize the text in one short sentence'''
-    prompt = PromptTemplate(
-        input_variables=["text"],
-        template="Summarize the following text in one short sentence.\n\nText:{text}\n\nSummary:"
-    )
-    message = HumanMessage(content=prompt.format(text=state["text"]))
-    summary = llm.invoke([message]).content.strip()
-    return {"summary": summary}
-
-
-
-
-
-# Create our StateGraph
-workflow = StateGraph(State)
-
-# Add nodes to the graph
-workflow.add_node("classification_node", classification_node)
-workflow.add_node("entity_extraction", entity_extraction_node)
-workflow.add_node("summarization", summarization_node)
-
-# Add edges to the graph
-workflow.set_entry_point("classification_node")  # Set the entry point of the graph
-workflow.add_edge("classification_node", "entity_extraction")
-workflow.add_edge("entity_extraction", "summarization")
-workflow.add_edge("summarization", END)
+from text_pipeline import PIPELINE_MODE, build_graph
 
-# Compile the graph
-app = workflow.compile()
+# Compile the graph: by default classification, entity extraction and summarization in parallel
+app = build_graph(PIPELINE_MODE, parallel=os.getenv("PIPELINE_SEQUENTIAL", "") == "")
 
 # Display a visualization of our graph
 # try:
@@ -107,7 +29,7 @@ app = workflow.compile()
 
 # except Exception as e:
 #     print(f"Error generating visualization: {e}")
-#     print("The graph structure is: classification_node -> entity_extraction -> summarization -> END")
+#     print("The graph structure is: START -> chunking -> (classification_node | entity_extraction | summarization) -> join -> END")
 
 
 sample_text = """
@@ -116,9 +38,14 @@ Additionally, the model is designed to be more efficient and scalable than its p
 """
 
 state_input = {"text": sample_text}
+start = time.perf_counter()
 result = app.invoke(state_input)
+elapsed = time.perf_counter() - start
 
 print(result)
 print("Classification:", result["classification"])
 print("\nEntities:", result["entities"])
-print("\nSummary:", result["summary"])
\ No newline at end of file
+print("\nSummary:", result["summary"])
+print("\nNode latency:", ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result["timings"].items()))
+print(f"Pipeline latency: {elapsed:.2f}s (slowest node {max(result['timings'].values()):.2f}s, "
+      f"sum of nodes {sum(result['timings'].values()):.2f}s)")
\ No newline at end of file
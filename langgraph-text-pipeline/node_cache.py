@@ -0,0 +1,99 @@
+"""Persistent result cache for text pipeline nodes, backed by SQLite.
+
+A node's output only depends on the node, its prompt template, the model,
+the temperature and the text, so the cache key is a SHA-256 of exactly
+those. Re-running the pipeline over a corpus then only calls the LLM for
+documents (or prompts, or models) that changed.
+
+The cache is bounded by the total size of the stored results: when a write
+takes it over `max_bytes`, the least recently used entries are dropped until
+it is back under 90% of the limit.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class NodeCache:
+    def __init__(self, path: str = "node_cache.db", max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()  # Graph branches run on several threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                node TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+            """
+        )
+        self._conn.commit()
+        self.size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    @staticmethod
+    def key(node: str, template: str, model: str, temperature: Optional[float], text: str) -> str:
+        parts = json.dumps([node, template, model, temperature, text], ensure_ascii=False)
+        return hashlib.sha256(parts.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "UPDATE results SET last_used = ? WHERE key = ? RETURNING value", (time.time(), key)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, node: str, value: dict) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._conn:
+            old = self._conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, node, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, node, data, len(data), time.time()),
+            )
+            self.size += len(data) - (old[0] if old else 0)
+            if self.size > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+
+    def _evict(self, target: int) -> None:
+        cursor = self._conn.execute("SELECT key, size FROM results ORDER BY last_used")
+        dropped = []
+        for key, size in cursor:
+            if self.size <= target:
+                break
+            dropped.append((key,))
+            self.size -= size
+        cursor.close()
+        self._conn.executemany("DELETE FROM results WHERE key = ?", dropped)
+        self.evictions += len(dropped)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "bytes": self.size,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
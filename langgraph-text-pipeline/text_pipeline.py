@@ -0,0 +1,352 @@
+"""Text pipeline: classify a text, extract its entities and summarize it.
+
+The graph is built here so it can be imported (langgraph-agent.py runs it on
+a sample text, batch.py over a corpus). Two modes (PIPELINE_MODE):
+
+    multi       one LLM call per task, as parallel graph nodes
+    structured  a single structured-output call returning all three fields,
+                so the text is sent (and its input tokens paid) once
+
+Long texts are split into overlapping chunks of at most CHUNK_TOKENS tokens
+(counted with tiktoken's CHUNK_ENCODING) first. Entity extraction, summarization and the structured analysis are
+mapped over the chunks concurrently and reduced (entities merged and
+de-duplicated, partial summaries combined, in rounds of at most
+SUMMARY_REDUCE_FANIN), so no single LLM call grows with the document.
+Classification reads the first chunk. A text that fits in one chunk takes
+exactly one call per node, as before.
+
+Importing this module has no side effects: the model client is created (and
+the API key asked for, if it is not configured) by `build_graph`, and node
+results are only cached when a cache is passed to it (`open_node_cache`).
+"""
+import functools
+import getpass
+import json
+import os
+import re
+import time
+from collections import Counter
+from dotenv import load_dotenv
+from typing import Callable, Iterable, Literal, Optional, TypedDict, List, Annotated
+from pydantic import BaseModel, Field
+from langgraph.graph import StateGraph, START, END
+from langchain.prompts import PromptTemplate
+from langchain.schema import HumanMessage
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from node_cache import NodeCache
+
+load_dotenv()
+
+
+def ensure_api_key() -> None:
+    if not os.getenv("GOOGLE_API_KEY"):
+        os.environ["GOOGLE_API_KEY"] = getpass.getpass("Enter your Google AI API key: ")
+
+
+@functools.cache
+def get_llm() -> ChatGoogleGenerativeAI:
+    ensure_api_key()
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash-lite",
+        temperature=0,
+        max_tokens=None,
+        timeout=None,
+        max_retries=2,
+    )
+
+# response = get_llm().invoke("Hello! Are you working?")
+# print(response.content)
+
+# Chunking and map-reduce settings
+CHUNK_ENCODING = os.getenv("PIPELINE_CHUNK_ENCODING", "cl100k_base")  # tiktoken encoding chunks are measured in
+CHUNK_TOKENS = int(os.getenv("PIPELINE_CHUNK_TOKENS", 2000))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("PIPELINE_CHUNK_OVERLAP_TOKENS", 200))
+MAP_CONCURRENCY = int(os.getenv("PIPELINE_MAP_CONCURRENCY", 8))
+SUMMARY_REDUCE_FANIN = 8
+
+def merge_timings(left: dict, right: dict) -> dict:
+    return {**(left or {}), **(right or {})}
+
+
+class State(TypedDict):
+    text: str
+    classification: str
+    entities: List[str]
+    summary: str
+    chunks: List[str]
+    timings: Annotated[dict, merge_timings]  # node name -> seconds, written by parallel branches
+
+
+CLASSIFICATION_PROMPT = PromptTemplate(
+    input_variables=["text"],
+    template="Classify the following text into one of the categories: News, Blog, Research, or Other.\n\nText:{text}\n\nCategory:"
+)
+
+ENTITY_PROMPT = PromptTemplate(
+    input_variables=["text"],
+    template="Extract all the entities (Person, Organization, Location) from the following text. Provide the result as a comma-separated list.\n\nText:{text}\n\nEntities:"
+)
+
+SUMMARY_PROMPT = PromptTemplate(
+    input_variables=["text"],
+    template="Summarize the following text in one short sentence.\n\nText:{text}\n\nSummary:"
+)
+
+COMBINE_SUMMARIES_PROMPT = PromptTemplate(
+    input_variables=["text"],
+    template="These are summaries of consecutive parts of one text. Combine them into one short sentence that summarizes the whole text.\n\nSummaries:\n{text}\n\nSummary:"
+)
+
+ANALYSIS_PROMPT = PromptTemplate(
+    input_variables=["text"],
+    template="Analyze the following text: classify it into one of the categories News, Blog, Research, or Other, "
+             "extract all the entities (Person, Organization, Location), and summarize it in one short sentence.\n\nText:{text}"
+)
+
+
+@functools.cache
+def get_text_splitter() -> RecursiveCharacterTextSplitter:
+    # Sizes are counted in tokens, so code, CJK text or dense numbers cannot
+    # make a chunk longer than CHUNK_TOKENS the way a character estimate would
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name=CHUNK_ENCODING,
+        chunk_size=CHUNK_TOKENS,
+        chunk_overlap=CHUNK_OVERLAP_TOKENS,
+    )
+
+
+def chunk_node(state: State):
+    '''Split the text into overlapping chunks of at most CHUNK_TOKENS tokens'''
+    return {"chunks": get_text_splitter().split_text(state["text"]) or [state["text"]]}
+
+
+def chunks_of(state: State) -> List[str]:
+    return state.get("chunks") or [state["text"]]
+
+
+def map_prompt(prompt: PromptTemplate, texts: List[str], model=None, return_exceptions: bool = False) -> list:
+    """Run `prompt` over every text concurrently (one call when there is a single text).
+
+    With `return_exceptions`, a call that raises gives its exception in place
+    of a result instead of failing the others.
+    """
+    model = model or get_llm()
+    messages = [[HumanMessage(content=prompt.format(text=text))] for text in texts]
+    if len(messages) == 1:
+        try:
+            return [model.invoke(messages[0])]
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return [e]
+    return model.batch(messages, config={"max_concurrency": MAP_CONCURRENCY}, return_exceptions=return_exceptions)
+
+
+def parse_entities(content: str) -> List[str]:
+    return [entity.strip(" .-*") for entity in re.split(r"[,\n]", content) if entity.strip(" .-*")]
+
+
+def merge_entities(entity_lists: Iterable[List[str]]) -> List[str]:
+    """Entities from every chunk, in order of first appearance, without duplicates."""
+    seen, merged = set(), []
+    for entities in entity_lists:
+        for entity in entities:
+            key = re.sub(r"\W+", " ", entity).strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(entity)
+    return merged
+
+
+def combine_summaries(summaries: List[str]) -> str:
+    """Reduce partial summaries to one, combining at most SUMMARY_REDUCE_FANIN per call."""
+    while len(summaries) > 1:
+        groups = [summaries[i:i + SUMMARY_REDUCE_FANIN] for i in range(0, len(summaries), SUMMARY_REDUCE_FANIN)]
+        responses = map_prompt(COMBINE_SUMMARIES_PROMPT, ["\n".join(group) for group in groups])
+        summaries = [response.content.strip() for response in responses]
+    return summaries[0]
+
+
+def classification_node(state: State):
+    '''Classify the text into one of the categories: News, Blog, Research, or Other'''
+    message = HumanMessage(content=CLASSIFICATION_PROMPT.format(text=chunks_of(state)[0]))
+    classification = get_llm().invoke([message]).content.strip()
+    return {"classification": classification}
+
+
+def entity_extraction_node(state: State):
+    '''Extract all the entities (Person, Organization, Location) from the text'''
+    responses = map_prompt(ENTITY_PROMPT, chunks_of(state))
+    entities = merge_entities(parse_entities(response.content) for response in responses)
+    return {"entities": entities}
+
+def summarization_node(state: State):
+    '''Summarize the text in one short sentence'''
+    responses = map_prompt(SUMMARY_PROMPT, chunks_of(state))
+    summary = combine_summaries([response.content.strip() for response in responses])
+    return {"summary": summary}
+
+
+class TextAnalysis(BaseModel):
+    """Classification, entities and summary of a text."""
+    classification: Literal["News", "Blog", "Research", "Other"] = Field(description="Category of the text")
+    entities: List[str] = Field(description="Every Person, Organization and Location mentioned in the text")
+    summary: str = Field(description="The text summarized in one short sentence")
+
+
+@functools.cache
+def get_structured_llm():
+    return get_llm().with_structured_output(TextAnalysis)
+
+
+def separate_analysis(text: str) -> TextAnalysis:
+    """Analyze one chunk with the per-task prompts (fallback for missing or invalid structured output)."""
+    messages = [
+        [HumanMessage(content=prompt.format(text=text))]
+        for prompt in (CLASSIFICATION_PROMPT, ENTITY_PROMPT, SUMMARY_PROMPT)
+    ]
+    classification, entities, summary = get_llm().batch(messages)
+    # The free-text category may be outside the Literal, so skip validation
+    return TextAnalysis.model_construct(
+        classification=classification.content.strip(),
+        entities=parse_entities(entities.content),
+        summary=summary.content.strip(),
+    )
+
+
+def analysis_node(state: State):
+    '''Classify, extract entities and summarize with one structured-output call'''
+    chunks = chunks_of(state)
+    analyses = map_prompt(ANALYSIS_PROMPT, chunks, model=get_structured_llm(), return_exceptions=True)
+    # with_structured_output returns None when the reply has no tool call and
+    # raises when its arguments do not validate (e.g. an unknown category);
+    # analyze those chunks the multi-node way instead of failing the document
+    analyses = [
+        analysis if isinstance(analysis, TextAnalysis) else separate_analysis(chunk)
+        for chunk, analysis in zip(chunks, analyses)
+    ]
+    # Most common category across chunks (ties go to the earliest chunk)
+    classification = Counter(analysis.classification for analysis in analyses).most_common(1)[0][0]
+    return {
+        "classification": classification,
+        "entities": merge_entities(analysis.entities for analysis in analyses),
+        "summary": combine_summaries([analysis.summary for analysis in analyses]),
+    }
+
+
+def timed(name: str, node: Callable) -> Callable:
+    """Wrap a node so it also reports how long it took."""
+    def run(state: State):
+        start = time.perf_counter()
+        update = node(state)
+        return {**update, "timings": {name: time.perf_counter() - start}}
+    return run
+
+
+def cached(name: str, node: Callable, cache: NodeCache) -> Callable:
+    """Wrap a node so its result is looked up in (and stored to) `cache`."""
+    # Chunking changes what the map-reduce nodes produce, so it is part of the key
+    template = f"{NODE_TEMPLATES[name]}|chunks={CHUNK_TOKENS}/{CHUNK_OVERLAP_TOKENS}/{CHUNK_ENCODING}"
+    llm = get_llm()
+    def run(state: State):
+        key = cache.key(name, template, llm.model, llm.temperature, state["text"])
+        update = cache.get(key)
+        if update is None:
+            update = node(state)
+            cache.put(key, name, update)
+        return update
+    return run
+
+
+def join_node(state: State):
+    '''Runs once, after every branch has finished'''
+    return {}
+
+
+# Each node reads only the text (or its chunks) and writes its own key, so they can run side by side
+ANALYSIS_NODES = {
+    "classification_node": classification_node,
+    "entity_extraction": entity_extraction_node,
+    "summarization": summarization_node,
+    "analysis": analysis_node,
+}
+
+# Nodes each mode runs
+PIPELINE_MODES = {
+    "multi": ["classification_node", "entity_extraction", "summarization"],
+    "structured": ["analysis"],
+}
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "multi")
+
+# What a node's output depends on besides model, temperature and text (part of its cache key)
+NODE_TEMPLATES = {
+    "classification_node": CLASSIFICATION_PROMPT.template,
+    "entity_extraction": ENTITY_PROMPT.template,
+    "summarization": SUMMARY_PROMPT.template + COMBINE_SUMMARIES_PROMPT.template,
+    "analysis": ANALYSIS_PROMPT.template + COMBINE_SUMMARIES_PROMPT.template
+                + json.dumps(TextAnalysis.model_json_schema(), sort_keys=True)
+                + CLASSIFICATION_PROMPT.template + ENTITY_PROMPT.template + SUMMARY_PROMPT.template,
+}
+
+# Results of previous runs; off unless a path is given (here or with batch.py --cache)
+PIPELINE_CACHE_PATH = os.getenv("PIPELINE_CACHE_PATH", "")
+PIPELINE_CACHE_MAX_MB = int(os.getenv("PIPELINE_CACHE_MAX_MB", 256))
+
+
+def open_node_cache(path: str = PIPELINE_CACHE_PATH, max_mb: int = PIPELINE_CACHE_MAX_MB) -> Optional[NodeCache]:
+    """Open (creating it if needed) the node result cache at `path`; None when `path` is empty."""
+    return NodeCache(path, max_mb * 1024 * 1024) if path else None
+
+
+def build_graph(
+    mode: str = "multi",
+    nodes: Optional[List[str]] = None,
+    join: Optional[Callable] = join_node,
+    parallel: bool = True,
+    cache: Optional[NodeCache] = None,
+):
+    """Compile the pipeline.
+
+    `mode` picks the nodes (see PIPELINE_MODES) unless `nodes` is given.
+    With `parallel`, every node is a branch from chunking and the branches meet
+    in `join` (any node function; None sends each branch straight to END,
+    the graph still finishes only once all of them have). Otherwise the
+    nodes run one after another, as before. With a `cache`, every node first
+    looks its result up there. The chunking node always runs first.
+
+    The model clients are created here (asking for the API key if needed),
+    so nodes running on worker threads never prompt, and so is the text
+    splitter (tiktoken downloads its encoding the first time it is used).
+    """
+    nodes = nodes or PIPELINE_MODES[mode]
+    get_llm()
+    get_text_splitter()
+    if "analysis" in nodes:
+        get_structured_llm()
+    workflow = StateGraph(State)
+    workflow.add_node("chunking", timed("chunking", chunk_node))
+    workflow.add_edge(START, "chunking")
+    for name in nodes:
+        node = ANALYSIS_NODES[name]
+        if cache is not None:
+            node = cached(name, node, cache)
+        workflow.add_node(name, timed(name, node))
+
+    if not parallel:
+        workflow.add_edge("chunking", nodes[0])
+        for previous, name in zip(nodes, nodes[1:]):
+            workflow.add_edge(previous, name)
+        workflow.add_edge(nodes[-1], END)
+    elif join is None:
+        for name in nodes:
+            workflow.add_edge("chunking", name)
+            workflow.add_edge(name, END)
+    else:
+        workflow.add_node("join", join)
+        for name in nodes:
+            workflow.add_edge("chunking", name)
+        workflow.add_edge(nodes, "join")  # Waits for all branches
+        workflow.add_edge("join", END)
+    return workflow.compile()
@@ -1,5 +1,8 @@
+import uuid
+
 from langchain.schema import HumanMessage
 from .utils.nodes import initialize_node, clarify_node, research_node, report_node
+from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import StateGraph, MessagesState, START, END
 
 state = MessagesState()
@@ -16,24 +19,27 @@ graph.add_edge("clarify", "research")
 graph.add_edge("research", "report")
 graph.add_edge("report", END)
 
-app = graph.compile()
+# The checkpointer keeps each session's state between turns; the graph pauses
+# after asking its clarifying questions and resumes at research once they are answered
+app = graph.compile(checkpointer=InMemorySaver(), interrupt_after=["clarify"])
 
 def chat():
-    state = {"messages": [HumanMessage(content=input("Enter your research topic: "))]}
+    # One thread per research session, so every node runs once per session
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    state = app.invoke({"messages": [HumanMessage(content=input("Enter your research topic: "))]}, config)
     while True:
-        state = app.invoke(state)
         print(f"\nAI: {state['messages'][-1].content}\n")
 
-        if "Final Research Summary" in state["messages"][-1].content:
-            break
+        if not app.get_state(config).next:
+            break  # Report written, session finished
 
         user_input = input("You: ")
         if user_input.lower() in ["exit", "quit"]:
             break
 
-        state["messages"].append(HumanMessage(content=user_input))
-
-chat()
+        # Add the answers to the paused session and continue from where it stopped
+        app.update_state(config, {"messages": [HumanMessage(content=user_input)]})
+        state = app.invoke(None, config)
 
 
 if __name__ == "__main__":
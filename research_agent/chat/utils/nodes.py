@@ -1,11 +1,15 @@
+import re
+
 from langchain_core.messages import AIMessage, HumanMessage
 from langgraph.graph import MessagesState
 from ...utils import get_llm
-from langchain_community.tools import DuckDuckGoSearchResults
+from .tools import multi_search
 
-search_tool = DuckDuckGoSearchResults()
 llm = get_llm()
 
+# Focused sub-queries searched per research session
+MAX_QUERIES = 4
+
 def initialize_node(state: MessagesState):
     user_input = state["messages"][-1].content
     print(f"\n[🟦 Initialize Node] Extracting topic from user input: {user_input}\n")
@@ -48,6 +52,21 @@ def clarify_node(state: MessagesState):
 # -----------------------------
 # Node 3: Research
 # -----------------------------
+def plan_queries(topic: str, answers: str) -> list:
+    """Turn the topic and the user's answers into a few focused web search queries."""
+    planning_prompt = f"""
+    You are planning web searches for this research topic: {topic}
+    The user's focus, from their answers to your clarifying questions: {answers or "not specified"}
+
+    Write up to {MAX_QUERIES} short, focused search queries that together cover the topic
+    from different angles. Output one query per line, nothing else.
+    """
+    lines = llm.invoke([HumanMessage(content=planning_prompt)]).content.splitlines()
+    queries = [re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip().strip('"') for line in lines]
+    queries = list(dict.fromkeys(q for q in queries if q))[:MAX_QUERIES]
+    return queries or [topic]
+
+
 def research_node(state: MessagesState):
     print(f"[🟩 Research Node] Searching and summarizing information...\n")
 
@@ -61,13 +80,22 @@ def research_node(state: MessagesState):
         print("[⚠️] No topic found in messages.")
         return state
 
-    search_results = search_tool.run(topic)
-    search_text = "\n".join(search_results) if isinstance(search_results, list) else search_results
+    # The user's answers to the clarifying questions (every message after the original request)
+    answers = "\n".join(msg.content for msg in state["messages"][1:] if isinstance(msg, HumanMessage))
+
+    queries = plan_queries(topic, answers)
+    print(f"[🔎 Research Node] Searching {len(queries)} queries in parallel: {queries}\n")
+    search_results = multi_search(queries)
+    search_text = "\n".join(
+        f"- {result.get('title', '')}: {result.get('snippet', '')} ({result.get('link', '')})"
+        for result in search_results
+    )
 
     summary_prompt = f"""
     Summarize key insights about '{topic}' from these search results.
     Focus on facts, studies, or evidence.
-    Results:\n{search_text[:4000]}
+    The user's focus, from their answers to your clarifying questions: {answers or "not specified"}
+    Results:\n{search_text[:8000]}
     """
     summary = llm.invoke([HumanMessage(content=summary_prompt)]).content
     print(f"[🤖 AI] Summary generated for topic '{topic}'.\n")
@@ -0,0 +1,64 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from langchain_community.tools import DuckDuckGoSearchResults
+
+# Results as a list of {"snippet", "title", "link"} dicts, so they can be deduplicated
+search_tool = DuckDuckGoSearchResults(output_format="list", max_results=5)
+
+# Snippets sharing at least this share of their words are treated as the same result
+SIMILARITY_THRESHOLD = 0.8
+
+
+def normalize_url(url: str) -> str:
+    # Scheme and host are case-insensitive; path and query are not
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}{'?' + parts.query if parts.query else ''}"
+
+
+def _words(text: str) -> set:
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def _similar(a: set, b: set) -> bool:
+    return bool(a and b) and len(a & b) / len(a | b) >= SIMILARITY_THRESHOLD
+
+
+def search_one(query: str) -> List[Dict]:
+    try:
+        results = search_tool.run(query)
+    except Exception as e:
+        print(f"[⚠️] Search failed for '{query}': {e}")
+        return []
+    return results if isinstance(results, list) else [{"snippet": str(results), "title": query, "link": ""}]
+
+
+def multi_search(queries: List[str]) -> List[Dict]:
+    """Run every query concurrently and merge the results, dropping duplicates.
+
+    A result is a duplicate if its URL (ignoring scheme, host case, "www." and a trailing
+    slash) was already seen, or if its snippet shares most of its words with
+    a kept snippet (the same story syndicated on another site).
+    """
+    with ThreadPoolExecutor(max_workers=max(1, len(queries))) as pool:
+        result_lists = list(pool.map(search_one, queries))
+
+    merged, seen_urls, seen_words = [], set(), []
+    # Round-robin over the queries so every query's best results come first
+    for rank in range(max((len(results) for results in result_lists), default=0)):
+        for results in result_lists:
+            if rank >= len(results):
+                continue
+            result = results[rank]
+            url = normalize_url(result.get("link", ""))
+            words = _words(result.get("snippet", ""))
+            if (url and url in seen_urls) or any(_similar(words, seen) for seen in seen_words):
+                continue
+            if url:
+                seen_urls.add(url)
+            seen_words.append(words)
+            merged.append(result)
+    return merged
@@ -0,0 +1,330 @@
+"""Micro-benchmark for long-term memory storage and retrieval.
+
+Fills a benchmark copy of the `agent_memories` index with synthetic vectors at
+increasing scale and measures store, dedup (`similar_memory_exists`) and
+retrieve (`retrieve_memories`) latency for every vector algorithm / filter
+combination. Each run is appended as one JSON line to the output file so runs
+can be diffed against each other.
+
+`--race` instead runs a dedup stress test: many threads store the same
+memories concurrently and the index must end up with exactly one copy each.
+
+Usage:
+    python benchmark_memory.py --scales 1000 10000 --algorithms flat hnsw
+    python benchmark_memory.py --race --threads 32 --memories 50
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import ulid
+
+from memory_data_models import MemoryType, get_memory_schema
+from memory_utils import FINGERPRINT_PREFIX, MemoryUtils
+from redisvl.query import CountQuery
+from redisvl.query.filter import Tag
+from utils import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCALES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_ALGORITHMS = ["flat", "hnsw"]
+FILTER_COMBINATIONS = ["user", "user+type", "user+type+thread"]
+
+HNSW_ATTRS = {"m": 16, "ef_construction": 200, "ef_runtime": 10}
+
+# Tag distribution: a handful of heavy users own most memories (zipf), most
+# memories are episodic, and each user spreads them over a few threads.
+NUM_USERS = 1_000
+ZIPF_EXPONENT = 1.2
+EPISODIC_RATIO = 0.7
+THREADS_PER_USER = 8
+
+
+class SyntheticVectorizer:
+    """Deterministic stand-in for VertexAITextVectorizer.
+
+    The same text always maps to the same unit vector, so queries built from
+    stored content find their exact match just like real embeddings would.
+    """
+
+    def __init__(self, dims: int) -> None:
+        self.dims = dims
+
+    def embed(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha1(text.encode()).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dims).astype(np.float32)
+        vector /= np.linalg.norm(vector)
+        return vector.tolist()
+
+
+class SyntheticCorpus:
+    """Generates memory records with a realistic tag distribution."""
+
+    def __init__(self, vectorizer: SyntheticVectorizer, seed: int = 42) -> None:
+        self.vectorizer = vectorizer
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.per_user: Dict[str, int] = {}
+        self.owners: List[Tuple[str, str, MemoryType]] = []  # (user_id, thread_id, memory_type) per record
+
+    def _user(self) -> str:
+        rank = int(self.rng.zipf(ZIPF_EXPONENT))
+        return f"user_{(rank - 1) % NUM_USERS}"
+
+    def _memory_type(self) -> MemoryType:
+        return MemoryType.EPISODIC if self.rng.random() < EPISODIC_RATIO else MemoryType.SEMANTIC
+
+    def record(self) -> dict:
+        user_id = self._user()
+        memory_type = self._memory_type()
+        thread_id = f"{user_id}_thread_{int(self.rng.integers(THREADS_PER_USER))}"
+        content = f"synthetic memory {self.count} for {user_id}"
+        self.count += 1
+        self.per_user[user_id] = self.per_user.get(user_id, 0) + 1
+        self.owners.append((user_id, thread_id, memory_type))
+        return {
+            "user_id": user_id,
+            "content": content,
+            "memory_type": memory_type.value,
+            "metadata": "{}",
+            "created_at": datetime.now().isoformat(),
+            "embedding": self.vectorizer.embed(content),
+            "memory_id": str(ulid.ULID()),
+            "thread_id": thread_id,
+        }
+
+    def sample(self, n: int, label: str) -> List[dict]:
+        """Pick `n` query targets; half reuse stored content, half are unseen.
+
+        Hits carry the user, thread and memory type of the stored record, so
+        every filter combination can match it. Unseen content includes
+        `label` (scale and filter combination), so it is new in every
+        measurement and "store" really writes instead of hitting the
+        fingerprint of an earlier round.
+        """
+        samples = []
+        for i in range(n):
+            if i % 2 == 0 and self.count:
+                target = int(self.rng.integers(self.count))
+                user_id, thread_id, memory_type = self.owners[target]
+                content = f"synthetic memory {target} for {user_id}"
+            else:
+                user_id = self._user()
+                thread_id = f"{user_id}_thread_{int(self.rng.integers(THREADS_PER_USER))}"
+                memory_type = self._memory_type()
+                content = f"unseen query {i} ({label}) for {user_id}"
+            samples.append({
+                "user_id": user_id,
+                "thread_id": thread_id,
+                "memory_type": memory_type,
+                "content": content,
+            })
+        return samples
+
+
+def fill(memory_util: MemoryUtils, corpus: SyntheticCorpus, target: int, batch_size: int) -> float:
+    """Load synthetic memories until the index holds `target` of them."""
+    start = time.perf_counter()
+    while corpus.count < target:
+        batch = [corpus.record() for _ in range(min(batch_size, target - corpus.count))]
+        memory_util.long_term_memory_index.load(batch)
+    return time.perf_counter() - start
+
+
+def measure(operation: Callable[[dict], object], samples: List[dict]) -> dict:
+    """Run `operation` once per sample and summarize the latencies."""
+    latencies = []
+    start = time.perf_counter()
+    for sample in samples:
+        op_start = time.perf_counter()
+        operation(sample)
+        latencies.append((time.perf_counter() - op_start) * 1000)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        "count": len(latencies),
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "throughput_ops": len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+def filter_kwargs(sample: dict, combination: str) -> dict:
+    kwargs = {"user_id": sample["user_id"]}
+    if "type" in combination:
+        kwargs["memory_type"] = sample["memory_type"]
+    if "thread" in combination:
+        kwargs["thread_id"] = sample["thread_id"]
+    return kwargs
+
+
+def benchmark_algorithm(
+    redis_client,
+    algorithm: str,
+    scales: List[int],
+    dims: int,
+    queries: int,
+    batch_size: int,
+) -> List[dict]:
+    schema = get_memory_schema(
+        index_name=f"bench_memories_{algorithm}",
+        prefix=f"bench_memory_{algorithm}",
+        algorithm=algorithm,
+        dims=dims,
+        vector_attrs=HNSW_ATTRS if algorithm == "hnsw" else None,
+    )
+    vectorizer = SyntheticVectorizer(dims)
+    memory_util = MemoryUtils(redis_client=redis_client, schema=schema, vectorizer=vectorizer)
+    corpus = SyntheticCorpus(vectorizer)
+
+    results = []
+    try:
+        for scale in scales:
+            fill_seconds = fill(memory_util, corpus, scale, batch_size)
+            heaviest_user = max(corpus.per_user.values())
+            logger.info(f"[{algorithm}] filled to {scale} memories in {fill_seconds:.1f}s")
+
+            for combination in FILTER_COMBINATIONS:
+                samples = corpus.sample(queries, label=f"{scale} {combination}")
+                operations = {
+                    "retrieve": lambda s: memory_util.retrieve_memories(
+                        query=s["content"], **filter_kwargs(s, combination)
+                    ),
+                    "dedup": lambda s: memory_util.similar_memory_exists(
+                        content=s["content"],
+                        memory_type=s["memory_type"],
+                        user_id=s["user_id"],
+                        thread_id=s["thread_id"] if "thread" in combination else None,
+                    ),
+                    "store": lambda s: memory_util.store_memory(
+                        content=s["content"],
+                        memory_type=s["memory_type"],
+                        user_id=s["user_id"],
+                        thread_id=s["thread_id"] if "thread" in combination else None,
+                    ),
+                }
+                for name, operation in operations.items():
+                    stats = measure(operation, samples)
+                    results.append({
+                        "algorithm": algorithm,
+                        "scale": scale,
+                        "filter": combination,
+                        "operation": name,
+                        "max_memories_per_user": heaviest_user,
+                        "fill_seconds": fill_seconds,
+                        **stats,
+                    })
+                    logger.info(
+                        f"[{algorithm}] scale={scale} filter={combination} {name}: "
+                        f"p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms "
+                        f"{stats['throughput_ops']:.0f} ops/s"
+                    )
+    finally:
+        drop_benchmark_index(memory_util)
+
+    return results
+
+
+def drop_benchmark_index(memory_util: MemoryUtils) -> None:
+    index = memory_util.long_term_memory_index
+    for key in memory_util.redis_client.scan_iter(f"{FINGERPRINT_PREFIX}:{index.name}:*"):
+        memory_util.redis_client.delete(key)
+    index.delete(drop=True)
+
+
+def dedup_race(redis_client, threads: int, memories: int, dims: int) -> dict:
+    """Store each memory from `threads` sessions at once and count the copies."""
+    schema = get_memory_schema(
+        index_name="bench_memories_race", prefix="bench_memory_race", dims=dims
+    )
+    memory_util = MemoryUtils(
+        redis_client=redis_client, schema=schema, vectorizer=SyntheticVectorizer(dims)
+    )
+    user_id = "race_user"
+
+    try:
+        for i in range(memories):
+            content = f"User prefers window seat number {i}"
+            barrier = threading.Barrier(threads)
+
+            def store(_):
+                barrier.wait()
+                return memory_util.store_memory(content, MemoryType.EPISODIC, user_id=user_id)
+
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                stored = sum(pool.map(store, range(threads)))
+            if stored != 1:
+                logger.error(f"Memory {i} was stored {stored} times")
+
+        count = memory_util.long_term_memory_index.query(
+            CountQuery(filter_expression=Tag("user_id") == user_id)
+        )
+    finally:
+        drop_benchmark_index(memory_util)
+
+    result = {"threads": threads, "memories": memories, "stored": count, "duplicates": count - memories}
+    logger.info(f"Dedup race: {result}")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--algorithms", nargs="+", default=DEFAULT_ALGORITHMS, choices=DEFAULT_ALGORITHMS)
+    parser.add_argument("--dims", type=int, default=3072)
+    parser.add_argument("--queries", type=int, default=200, help="Operations per measurement")
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--output", default="memory_benchmark.jsonl")
+    parser.add_argument("--race", action="store_true", help="Run the concurrent dedup stress test")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--memories", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    redis_client = get_redis_client()
+
+    if args.race:
+        result = dedup_race(redis_client, args.threads, args.memories, args.dims)
+        if result["duplicates"]:
+            raise SystemExit(f"Dedup race stored {result['duplicates']} duplicate memories")
+        print(f"Dedup race passed: {result['stored']} memories, no duplicates")
+        return
+
+    results = []
+    for algorithm in args.algorithms:
+        results.extend(
+            benchmark_algorithm(
+                redis_client, algorithm, sorted(args.scales), args.dims, args.queries, args.batch_size
+            )
+        )
+
+    run = {
+        "run_at": datetime.now().isoformat(),
+        "redis_url": os.getenv("REDIS_URL", "redis://localhost:6379"),
+        "dims": args.dims,
+        "queries": args.queries,
+        "results": results,
+    }
+    with open(args.output, "a") as f:
+        f.write(json.dumps(run) + "\n")
+    print(f"Wrote {len(results)} measurements to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
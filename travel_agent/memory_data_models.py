@@ -53,30 +53,50 @@ class StoredMemory(Memory):
     thread_id: Optional[str] = None
     memory_type: Optional[MemoryType] = None
 
-memory_schema = IndexSchema.from_dict({
-        "index": {
-            "name": "agent_memories",  # Index name for identification
-            "prefix": "memory",       # Redis key prefix (memory:1, memory:2, etc.)
-            "key_separator": ":",
-            "storage_type": "json",
-        },
-        "fields": [
-            {"name": "content", "type": "text"},
-            {"name": "memory_type", "type": "tag"},
-            {"name": "metadata", "type": "text"},
-            {"name": "created_at", "type": "text"},
-            {"name": "user_id", "type": "tag"},
-            {"name": "memory_id", "type": "tag"},
-            {
-                "name": "embedding",
-                "type": "vector",
-                "attrs": {
-                    "algorithm": "flat",
-                    "dims": 3072,  # googleAI embedding dimension
-                    "distance_metric": "cosine",
-                    "datatype": "float32",
-                },
-            },
-        ],
+def get_memory_schema(
+    index_name: str = "agent_memories",
+    prefix: str = "memory",
+    algorithm: str = "flat",
+    dims: int = 3072,
+    vector_attrs: Optional[dict] = None,
+) -> IndexSchema:
+    """Build the long-term memory index schema.
+
+    The defaults describe the production `agent_memories` index. Benchmarks use
+    a different name/prefix and vector algorithm (flat or hnsw) so they never
+    touch real user memories.
+    """
+    attrs = {
+        "algorithm": algorithm,
+        "dims": dims,  # googleAI embedding dimension
+        "distance_metric": "cosine",
+        "datatype": "float32",
     }
-)
\ No newline at end of file
+    if vector_attrs:
+        attrs.update(vector_attrs)
+
+    return IndexSchema.from_dict({
+            "index": {
+                "name": index_name,  # Index name for identification
+                "prefix": prefix,       # Redis key prefix (memory:1, memory:2, etc.)
+                "key_separator": ":",
+                "storage_type": "json",
+            },
+            "fields": [
+                {"name": "content", "type": "text"},
+                {"name": "memory_type", "type": "tag"},
+                {"name": "metadata", "type": "text"},
+                {"name": "created_at", "type": "text"},
+                {"name": "user_id", "type": "tag"},
+                {"name": "thread_id", "type": "tag"},
+                {"name": "memory_id", "type": "tag"},
+                {
+                    "name": "embedding",
+                    "type": "vector",
+                    "attrs": attrs,
+                },
+            ],
+        }
+    )
+
+memory_schema = get_memory_schema()
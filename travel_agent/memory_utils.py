@@ -1,8 +1,12 @@
+import hashlib
+import json
 import logging
 from utils import get_redis_client, get_vertex_embed
 from redisvl.index import SearchIndex
 from redisvl.query import VectorRangeQuery
 from redisvl.query.filter import Tag
+from redisvl.redis.utils import array_to_buffer
+from redisvl.schema.validation import validate_object
 from typing import Optional, List, Union
 from memory_data_models import MemoryType, memory_schema, StoredMemory
 import ulid
@@ -10,11 +14,58 @@ from datetime import datetime
 from utils import SYSTEM_USER_ID
 logger = logging.getLogger(__name__)
 
+FINGERPRINT_PREFIX = "memory_fingerprint"
+
+# Dedup-and-insert in a single round trip. Redis runs scripts atomically, so two
+# sessions storing the same memory can no longer both miss the check and insert.
+#   KEYS[1] fingerprint key, KEYS[2] key for the new memory
+#   ARGV[1] index name, ARGV[2] range query, ARGV[3] query vector blob,
+#   ARGV[4] distance threshold, ARGV[5] memory JSON document
+# Returns {1, new_key} when stored, {0, existing_key} when a duplicate exists.
+#
+# Every key the script writes is declared in KEYS, but FT.SEARCH reads index
+# documents that cannot be declared up front, and the two keys hash to
+# different slots. Only standalone Redis (not Redis Cluster) is supported.
+# The script writes the document with JSON.SET instead of going through
+# SearchIndex.load, so store_memory validates it against the schema first.
+DEDUP_AND_INSERT_SCRIPT = """
+local existing = redis.call('GET', KEYS[1])
+if existing then
+    return {0, existing}
+end
+local found = redis.call(
+    'FT.SEARCH', ARGV[1], ARGV[2],
+    'PARAMS', 4, 'vector', ARGV[3], 'distance_threshold', ARGV[4],
+    'NOCONTENT', 'LIMIT', 0, 1, 'DIALECT', 2
+)
+if found[1] > 0 then
+    return {0, found[2]}
+end
+redis.call('JSON.SET', KEYS[2], '$', ARGV[5])
+redis.call('SET', KEYS[1], KEYS[2])
+return {1, KEYS[2]}
+"""
+
+# Deletes a memory together with its fingerprint (if the fingerprint still
+# points at that memory), so the same content can be stored again later.
+#   KEYS[1] memory key, KEYS[2] fingerprint key
+# Returns the number of memories deleted (0 or 1).
+DELETE_MEMORY_SCRIPT = """
+if redis.call('GET', KEYS[2]) == KEYS[1] then
+    redis.call('DEL', KEYS[2])
+end
+return redis.call('DEL', KEYS[1])
+"""
+
 class MemoryUtils:
-    def __init__(self) -> None:
-        self.redis_client = get_redis_client()
-        self.long_term_memory_index = self.create_long_term_memory_index(self.redis_client, memory_schema)
-        self.vertex_embed = get_vertex_embed()
+    def __init__(self, redis_client=None, schema=memory_schema, vectorizer=None) -> None:
+        # redis_client / schema / vectorizer can be swapped out (e.g. by the
+        # memory benchmark) without touching the production index.
+        self.redis_client = redis_client or get_redis_client()
+        self.long_term_memory_index = self.create_long_term_memory_index(self.redis_client, schema)
+        self.vertex_embed = vectorizer or get_vertex_embed()
+        self.dedup_and_insert = self.redis_client.register_script(DEDUP_AND_INSERT_SCRIPT)
+        self.delete_with_fingerprint = self.redis_client.register_script(DELETE_MEMORY_SCRIPT)
 
 
     def create_long_term_memory_index(self,redis_client, memory_schema, validate_on_load=True):
@@ -41,13 +92,8 @@ class MemoryUtils:
     ) -> bool:
         """Check if a similar long-term memory already exists in Redis."""
 
-        vertex_embed = get_vertex_embed()
-        content_embedding = vertex_embed.embed(content)
-
-        filters = (Tag("user_id") == user_id) & (Tag("memory_type") == memory_type)
-
-        if thread_id:
-            filters = filters & (Tag("thread_id") == thread_id)
+        content_embedding = self.vertex_embed.embed(content)
+        filters = self.dedup_filter(memory_type, user_id, thread_id)
 
         # Search for similar memories
         vector_query = VectorRangeQuery(
@@ -69,6 +115,28 @@ class MemoryUtils:
             return True
 
         return False
+
+    def dedup_filter(self, memory_type: MemoryType, user_id: str, thread_id: Optional[str] = None):
+        """Filter that scopes duplicate detection to one user / memory type (/ thread)."""
+        filters = (Tag("user_id") == user_id) & (Tag("memory_type") == memory_type)
+
+        if thread_id:
+            filters = filters & (Tag("thread_id") == thread_id)
+        return filters
+
+    def fingerprint_key(
+        self,
+        content: str,
+        memory_type: MemoryType,
+        user_id: str,
+        thread_id: Optional[str] = None,
+    ) -> str:
+        """Key marking exact (whitespace/case-normalized) content as already stored."""
+        normalized = " ".join(content.lower().split())
+        digest = hashlib.sha256(
+            "|".join([user_id, memory_type.value, thread_id or "", normalized]).encode()
+        ).hexdigest()
+        return f"{FINGERPRINT_PREFIX}:{self.long_term_memory_index.name}:{digest}"
     
     def store_memory(
         self,
@@ -77,43 +145,89 @@ class MemoryUtils:
         user_id: str = SYSTEM_USER_ID,
         thread_id: Optional[str] = None,
         metadata: Optional[str] = None,
-        ):
+        distance_threshold: float = 0.1,
+        ) -> bool:
         """Store a long-term memory in Redis with deduplication.
 
             This function:
-            1. Checks for similar existing memories to avoid duplicates
-            2. Generates vector embeddings for semantic search
+            1. Generates vector embeddings for semantic search
+            2. Checks for exact (fingerprint) and similar (vector range) memories
             3. Stores the memory with metadata for retrieval
+
+            Steps 2 and 3 run server-side in one atomic script call, so
+            concurrent sessions cannot insert the same memory twice.
+            Returns True if the memory was stored.
             """
         if metadata is None:
             metadata = "{}"
+        user_id = user_id or SYSTEM_USER_ID
 
         logger.info(f"Preparing to store memory: {content}")
 
-        if self.similar_memory_exists(content, memory_type, user_id, thread_id):
-            logger.info("Similar memory found, skipping storage")
-            return
-
         embedding = self.vertex_embed.embed(content)
+        memory_id = str(ulid.ULID())
 
         memory_data = {
-            "user_id": user_id or SYSTEM_USER_ID,
+            "user_id": user_id,
             "content": content,
             "memory_type": memory_type.value,
             "metadata": metadata,
             "created_at": datetime.now().isoformat(),
             "embedding": embedding,
-            "memory_id": str(ulid.ULID()),
+            "memory_id": memory_id,
             "thread_id": thread_id,
         }
+        # Missing tag values are left out rather than stored as JSON null
+        memory_data = {k: v for k, v in memory_data.items() if v is not None}
 
         try:
-            self.long_term_memory_index.load([memory_data])
+            validate_object(self.long_term_memory_index.schema, memory_data)
+        except Exception as e:
+            logger.error(f"Memory does not match the index schema: {e}")
+            return False
+
+        filters = self.dedup_filter(memory_type, user_id, thread_id)
+        range_query = f"@embedding:[VECTOR_RANGE $distance_threshold $vector] {filters}"
+
+        try:
+            stored, key = self.dedup_and_insert(
+                keys=[
+                    self.fingerprint_key(content, memory_type, user_id, thread_id),
+                    self.long_term_memory_index.key(memory_id),
+                ],
+                args=[
+                    self.long_term_memory_index.name,
+                    range_query,
+                    array_to_buffer(embedding, dtype="float32"),
+                    distance_threshold,
+                    json.dumps(memory_data),
+                ],
+            )
         except Exception as e:
             logger.error(f"Error storing memory: {e}")
-            return
+            return False
+
+        if not stored:
+            logger.info(f"Similar memory found ({key!r}), skipping storage")
+            return False
 
         logger.info(f"Stored {memory_type} memory: {content}")
+        return True
+
+    def delete_memory(self, memory_id: str) -> bool:
+        """Delete a long-term memory and its exact-content fingerprint.
+
+        Returns True if the memory existed.
+        """
+        memory = self.long_term_memory_index.fetch(memory_id)
+        if memory is None:
+            return False
+        fingerprint = self.fingerprint_key(
+            memory["content"], MemoryType(memory["memory_type"]), memory["user_id"], memory.get("thread_id")
+        )
+        deleted = self.delete_with_fingerprint(keys=[self.long_term_memory_index.key(memory_id), fingerprint])
+        logger.info(f"Deleted memory {memory_id}")
+        return bool(deleted)
 
     def retrieve_memories(
         self,